@@ -1,17 +1,28 @@
+import abc
+import asyncio
 import enum
+import functools
+import hashlib
+import io
 import json
 import mimetypes
 import os
-from io import BytesIO
+import random
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from dateutil.parser import parse
 from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files import File
 from django.core.files.storage import Storage
 from django.utils.deconstruct import deconstructible
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from django.utils.module_loading import import_string
 
 
 class GoogleDrivePermissionType(enum.Enum):
@@ -125,12 +136,1012 @@ class GoogleDriveFilePermission(object):
         self._value = g_value
 
 
+class GoogleDrivePermissionError(Exception):
+    """
+    Raised when some permissions could not be applied to a file or folder
+
+    :param str file_id: Unique identifier of the file or folder
+    :param list errors: List of tuples made by the :class:`.GoogleDriveFilePermission` that failed and the error raised
+    """  # noqa: E501
+
+    def __init__(self, file_id, errors):
+        self.file_id = file_id
+        self.errors = errors
+        super().__init__(
+            'Unable to apply {0} permission(s) to {1}: {2}'.format(
+                len(errors), file_id, '; '.join(str(e) for _, e in errors))
+        )
+
+
 _ANYONE_CAN_READ_PERMISSION_ = GoogleDriveFilePermission(
     GoogleDrivePermissionRole.READER,
     GoogleDrivePermissionType.ANYONE
 )
 
 
+GoogleDriveCacheInfo = namedtuple(
+    'GoogleDriveCacheInfo', ['hits', 'misses', 'maxsize', 'currsize']
+)
+
+
+GoogleDriveEntry = namedtuple(
+    'GoogleDriveEntry', ['id', 'parent_id', 'name', 'is_folder', 'size']
+)
+
+
+GoogleDriveStat = namedtuple(
+    'GoogleDriveStat', [
+        'id', 'name', 'mime_type', 'size', 'url', 'created_time',
+        'modified_time',
+    ]
+)
+
+
+GoogleDriveSaveResult = namedtuple(
+    'GoogleDriveSaveResult', ['name', 'saved_name', 'error']
+)
+
+
+GoogleDriveRequestStats = namedtuple(
+    'GoogleDriveRequestStats', ['requests', 'throttled', 'retried']
+)
+
+
+class GoogleDriveUploadSessionStore(abc.ABC):
+    """
+    Base class of the stores keeping track of resumable uploads in progress,
+    so that a failed upload can be resumed by a later save of the same
+    content, even from another process.
+    Sessions are dicts with the ``uri`` of the upload session and the
+    ``offset`` of the bytes already sent.
+    """
+
+    @abc.abstractmethod
+    def get(self, key):
+        """
+        Retrieve a session
+
+        :param key: Key of the upload
+        :type key: string
+        :returns: dict or None if there is no session for the key
+        """
+
+    @abc.abstractmethod
+    def set(self, key, session):
+        """
+        Store a session
+
+        :param key: Key of the upload
+        :type key: string
+        :param session: Session of the upload
+        :type session: dict
+        """
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """
+        Remove a session, if it exists
+
+        :param key: Key of the upload
+        :type key: string
+        """
+
+
+class GoogleDriveCacheSessionStore(GoogleDriveUploadSessionStore):
+    """
+    Store upload sessions into one of the caches defined in Django
+    ``CACHES`` setting
+
+    :param cache: Alias of the cache
+    :type cache: string
+    :param int timeout: Seconds a session is kept (upload sessions expire after a week)
+    """  # noqa: E501
+
+    def __init__(self, cache='default', timeout=7 * 24 * 60 * 60):
+        self._cache = cache
+        self._timeout = timeout
+
+    def _key(self, key):
+        return 'gdstorage:upload:{0}'.format(key)
+
+    def get(self, key):
+        return caches[self._cache].get(self._key(key))
+
+    def set(self, key, session):
+        caches[self._cache].set(self._key(key), session, self._timeout)
+
+    def delete(self, key):
+        caches[self._cache].delete(self._key(key))
+
+
+class GoogleDriveFileSessionStore(GoogleDriveUploadSessionStore):
+    """
+    Store upload sessions as JSON files into a local directory
+
+    :param directory: Directory of the sessions (a directory inside the system temporary one by default)
+    :type directory: string
+    """  # noqa: E501
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.path.join(
+                tempfile.gettempdir(), 'gdstorage-uploads')
+        self._directory = directory
+
+    def _path(self, key):
+        return os.path.join(self._directory, '{0}.json'.format(key))
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, session):
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(key)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(session, f)
+        os.replace(path + '.tmp', path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+# Google Drive requires the chunks of resumable uploads to be multiple of it
+_UPLOAD_CHUNK_UNIT_ = 256 * 1024
+# Seconds every request of a resumable upload is expected to take
+_UPLOAD_CHUNK_TIME_ = 5
+
+
+def _adapt_chunk_size(chunk_size, elapsed, max_chunk_size):
+    """
+    Compute the chunk size of the next request of a resumable upload from
+    the throughput measured on the last one, so that every request takes
+    about ``_UPLOAD_CHUNK_TIME_`` seconds.
+    The chunk size never shrinks and at most doubles at every request.
+
+    :param int chunk_size: Size of the last chunk
+    :param float elapsed: Seconds taken to upload the last chunk
+    :param int max_chunk_size: Upper bound of the chunk size
+    :returns: int - A multiple of 256 KiB
+    """
+    throughput = chunk_size / max(elapsed, 0.001)
+    next_size = min(
+        int(throughput * _UPLOAD_CHUNK_TIME_), chunk_size * 2, max_chunk_size)
+    next_size -= next_size % _UPLOAD_CHUNK_UNIT_
+    return max(next_size, chunk_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _adaptive_media_upload_class():
+    """
+    Subclass of ``googleapiclient.http.MediaIoBaseUpload`` whose chunk size
+    can be changed between the requests of a resumable upload.
+    It is created on first use, as the Google API client is imported lazily.
+
+    :returns: type
+    """
+    from googleapiclient.http import MediaIoBaseUpload
+
+    class _AdaptiveMediaIoBaseUpload(MediaIoBaseUpload):
+
+        def __init__(self, fd, mimetype, chunksize, resumable):
+            super().__init__(
+                fd, mimetype, chunksize=chunksize, resumable=resumable)
+            self._adaptive_chunksize = chunksize
+
+        def chunksize(self):
+            return self._adaptive_chunksize
+
+        def set_chunksize(self, chunksize):
+            """
+            Change the size of the chunks sent from the next request on
+
+            :param int chunksize: Size of the chunks
+            """
+            self._adaptive_chunksize = chunksize
+
+    return _AdaptiveMediaIoBaseUpload
+
+
+class _PathCache(object):
+    """
+    Bounded, thread-safe LRU cache that maps storage paths to the metadata
+    returned by Google Drive. Every entry expires after ``ttl`` seconds so
+    changes made by other processes are eventually picked up.
+    Entries remember the fields they were retrieved with, so a lookup
+    needing more fields than a cached entry holds misses.
+
+    :param int max_entries: Maximum number of entries kept (0 disables the cache)
+    :param ttl: Seconds an entry is considered valid (None means forever)
+    :type ttl: int or float or None
+    """  # noqa: E501
+
+    def __init__(self, max_entries, ttl):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self):
+        """
+        Whether entries are kept at all
+
+        :rtype: bool
+        """
+        return bool(self._max_entries)
+
+    def get(self, key, fields=(), record=True):
+        """
+        Retrieve a cached entry.
+
+        :param key: Key of the entry
+        :param fields: Fields the entry must hold
+        :type fields: tuple of string
+        :param bool record: Whether the lookup updates hit / miss counters
+        :returns: dict containing cached metadata or None if missing, expired or partial
+        """  # noqa: E501
+        if not self._max_entries:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value, held = entry
+                if expires is not None and expires <= time.monotonic():
+                    del self._data[key]
+                elif held.issuperset(fields):
+                    self._data.move_to_end(key)
+                    if record:
+                        self._hits += 1
+                    return value
+            if record:
+                self._misses += 1
+            return None
+
+    def set(self, key, value, fields):
+        """
+        Store an entry, evicting the least recently used ones if needed.
+        An entry of the same file is merged with the new one, keeping its
+        expiration so that no field outlives ``ttl``.
+
+        :param key: Key of the entry
+        :param dict value: Metadata returned by Google Drive
+        :param fields: Fields requested to Google Drive for the entry
+        :type fields: tuple of string
+        """
+        if not self._max_entries:
+            return
+        fields = frozenset(fields)
+        expires = None
+        if self._ttl is not None:
+            expires = time.monotonic() + self._ttl
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1].get('id') == value.get('id') \
+                    and (entry[0] is None or entry[0] > time.monotonic()):
+                expires = entry[0]
+                value = dict(entry[1], **value)
+                fields = entry[2] | fields
+            self._data[key] = (expires, value, fields)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, path, file_id=None):
+        """
+        Drop the entries for a path, for everything below it and for every
+        entry pointing to the given file identifier.
+
+        :param str path: Normalized path to invalidate
+        :param file_id: Google Drive identifier of the removed item
+        :type file_id: str or None
+        """
+        prefix = path + '/'
+        with self._lock:
+            for key in list(self._data):
+                _, value, _ = self._data[key]
+                if key[1] == path or key[1].startswith(prefix) or \
+                        (file_id is not None and value.get('id') == file_id):
+                    del self._data[key]
+
+    def clear(self):
+        """
+        Remove every entry and reset counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        """
+        Report cache statistics.
+
+        :rtype: gdstorage.storage.GoogleDriveCacheInfo
+        """
+        with self._lock:
+            return GoogleDriveCacheInfo(
+                self._hits, self._misses, self._max_entries, len(self._data)
+            )
+
+
+class _RequestExecutor(object):
+    """
+    Issue requests to Google Drive at a bounded rate, using a token bucket,
+    and retry the ones failed because of rate limits or server errors,
+    waiting an exponentially growing (and jittered) delay between attempts.
+
+    :param max_qps: Maximum number of requests per second (None for no limit)
+    :type max_qps: int or float or None
+    :param int max_retries: Maximum number of times a request is retried
+    """
+
+    # Reasons of the 403 errors caused by rate limits
+    _RATE_LIMIT_REASONS_ = ('userRateLimitExceeded', 'rateLimitExceeded')
+    _RETRY_BASE_DELAY_ = 1
+    _RETRY_MAX_DELAY_ = 32
+
+    def __init__(self, max_qps, max_retries):
+        self._rate = max_qps
+        self._capacity = max(1.0, max_qps or 0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._throttled = 0
+        self._retried = 0
+
+    def _reserve(self, count):
+        """
+        Take ``count`` tokens from the bucket
+
+        :returns: float - Seconds to wait before issuing the requests
+        """
+        with self._lock:
+            self._requests += count
+            if self._rate is None:
+                return 0
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= count
+            if self._tokens >= 0:
+                return 0
+            self._throttled += count
+            return -self._tokens / self._rate
+
+    def is_retryable(self, error):
+        """
+        Tell whether a failed request can be retried: rate limits (429 and
+        403 with a rate limit reason) and server errors
+
+        :param error: Error raised by the request
+        :type error: Exception
+        :returns: bool
+        """
+        from googleapiclient.errors import HttpError
+
+        if not isinstance(error, HttpError):
+            return False
+        status = error.resp.status
+        if status == 429 or status >= 500:
+            return True
+        if status != 403:
+            return False
+        try:
+            reasons = [
+                e.get('reason') for e in
+                json.loads(error.content.decode())['error']['errors']
+            ]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return False
+        return any(r in self._RATE_LIMIT_REASONS_ for r in reasons)
+
+    def retry_delay(self, error, attempt):
+        """
+        Seconds to wait before retrying a failed request
+
+        :param error: Error raised by the request
+        :type error: Exception
+        :param int attempt: Number of retries already issued
+        :returns: float or None if the request should not be retried
+        """
+        if attempt >= self._max_retries or not self.is_retryable(error):
+            return None
+        with self._lock:
+            self._retried += 1
+        delay = min(
+            self._RETRY_MAX_DELAY_, self._RETRY_BASE_DELAY_ * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = error.resp.get('retry-after', '')
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        return delay
+
+    def execute(self, call, count=1):
+        """
+        Issue requests, waiting for the tokens they need and retrying them
+        when they fail
+
+        :param call: Callable issuing the requests (e.g. ``request.execute``)
+        :param int count: Number of requests issued by the callable
+        :returns: The result of the callable
+        """
+        from googleapiclient.errors import HttpError
+
+        attempt = 0
+        while True:
+            delay = self._reserve(count)
+            if delay:
+                time.sleep(delay)
+            try:
+                return call()
+            except HttpError as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def aexecute(self, call, count=1, retry=True):
+        """
+        Asynchronous counterpart of :meth:`execute`
+
+        :param call: Coroutine function issuing the requests
+        :param int count: Number of requests issued by the callable
+        :param bool retry: Whether failed requests are retried
+        :returns: The result of the callable
+        """
+        from googleapiclient.errors import HttpError
+
+        attempt = 0
+        while True:
+            delay = self._reserve(count)
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                return await call()
+            except HttpError as e:
+                delay = self.retry_delay(e, attempt) if retry else None
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        """
+        :rtype: gdstorage.storage.GoogleDriveRequestStats
+        """
+        with self._lock:
+            return GoogleDriveRequestStats(
+                self._requests, self._throttled, self._retried)
+
+
+class _GoogleDriveStream(io.RawIOBase):
+    """
+    Read-only, seekable file-like object that downloads the content of a
+    Google Drive file lazily with HTTP ``Range`` requests.
+
+    Data is fetched in blocks kept in a small LRU cache, so repeated
+    nearby reads do not hit the network. Random reads fetch a single
+    block, while sequential reads double the amount fetched by every
+    request (up to ``chunk_size``) to keep streaming efficient.
+
+    :param drive_service: Google Drive service used to issue the requests
+    :param str file_id: Unique identifier of the file to download
+    :param size: Size of the file in bytes, if known
+    :type size: int or None
+    :param int chunk_size: Maximum number of bytes fetched by a single request
+    :param int block_size: Size of the blocks fetched and cached
+    :param int cache_size: Maximum number of bytes kept in the block cache
+    :param execute: Function issuing the requests (see :meth:`_RequestExecutor.execute`)
+    """  # noqa: E501
+
+    def __init__(self, drive_service, file_id, size, chunk_size,
+                 block_size, cache_size, execute=None):
+        super().__init__()
+        self._drive_service = drive_service
+        self._execute = execute or (lambda call: call())
+        self._file_id = file_id
+        self._size = size
+        self._block_size = block_size
+        self._max_blocks = max(chunk_size, cache_size) // block_size
+        self._max_readahead = max(1, chunk_size // block_size)
+        self._readahead = 1
+        self._blocks = OrderedDict()
+        self._position = 0
+        self._last_end = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._size is not None
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            if self._size is None:
+                raise io.UnsupportedOperation(
+                    'File size is unknown, cannot seek from the end')
+            position = self._size + offset
+        else:
+            raise ValueError('Invalid whence ({0})'.format(whence))
+        if position < 0:
+            raise ValueError('Negative seek position {0}'.format(position))
+        self._position = position
+        return position
+
+    def _fetch(self, start, length):
+        """
+        Download ``length`` bytes starting from ``start``
+
+        :returns: bytes - Downloaded data, empty when the end of file is reached
+        """  # noqa: E501
+        from googleapiclient.errors import HttpError
+
+        request = self._drive_service.files().get_media(fileId=self._file_id)
+        request.headers['range'] = 'bytes={0}-{1}'.format(
+            start, start + length - 1)
+        try:
+            return self._execute(request.execute)
+        except HttpError as e:
+            # Range not satisfiable: the file ends before start
+            if e.resp.status == 416:
+                return b''
+            raise
+
+    def _load_blocks(self, index):
+        """
+        Download the block ``index`` and, when reading sequentially, the
+        blocks that follow it.
+
+        :returns: bytes - Data downloaded starting from the block
+        """
+        if self._last_end == index * self._block_size:
+            self._readahead = min(self._readahead * 2, self._max_readahead)
+        else:
+            self._readahead = 1
+        count = 1
+        while count < self._readahead and index + count not in self._blocks:
+            count += 1
+        start = index * self._block_size
+        length = count * self._block_size
+        if self._size is not None:
+            length = min(length, self._size - start)
+        data = self._fetch(start, length) if length > 0 else b''
+        for i in range(0, len(data), self._block_size):
+            self._blocks[index + i // self._block_size] = \
+                data[i:i + self._block_size]
+        while len(self._blocks) > self._max_blocks:
+            self._blocks.popitem(last=False)
+        self._last_end = start + len(data)
+        return data
+
+    def readinto(self, b):
+        length = len(b)
+        if self._size is not None:
+            length = min(length, self._size - self._position)
+        if length <= 0:
+            return 0
+        index, offset = divmod(self._position, self._block_size)
+        data = self._blocks.get(index)
+        if data is not None:
+            self._blocks.move_to_end(index)
+        else:
+            data = self._load_blocks(index)
+        data = data[offset:offset + length]
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class _PooledHttp(object):
+    """
+    Transport for the Google API client exposing the ``httplib2.Http``
+    interface, backed by an authorized ``requests`` session.
+    Unlike ``httplib2``, it is thread safe and it keeps a pool of keep-alive
+    connections shared by all threads.
+
+    :param credentials: Credentials used to authorize requests
+    :param int pool_size: Maximum number of connections kept alive
+    :param timeout: Seconds to wait for the server before giving up
+    :type timeout: int or float or None
+    """
+
+    def __init__(self, credentials, pool_size, timeout):
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+
+        self._session = AuthorizedSession(credentials)
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size))
+        self.timeout = timeout
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                redirections=5, connection_type=None):
+        """
+        Issue a request with the same signature and result of
+        ``httplib2.Http.request``
+
+        :returns: tuple made by an ``httplib2.Response`` and the content as bytes
+        """  # noqa: E501
+        import httplib2
+
+        response = self._session.request(
+            method, uri, data=body, headers=headers, timeout=self.timeout)
+        info = {k.lower(): v for k, v in response.headers.items()}
+        info['status'] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason
+        return resp, response.content
+
+
+class _AsyncDriveClient(object):
+    """
+    Non-blocking client for the Google Drive REST API, built on an
+    ``httpx.AsyncClient`` keeping a pool of keep-alive connections.
+    Requests of the lookup generators (see
+    :meth:`GoogleDriveStorage._run`) are issued with :meth:`files`.
+
+    :param credentials: Credentials used to authorize requests
+    :param int pool_size: Maximum number of connections kept alive
+    :param timeout: Seconds to wait for the server before giving up
+    :type timeout: int or float or None
+    :param executor: Executor throttling and retrying the requests
+    :type executor: gdstorage.storage._RequestExecutor
+    """
+
+    _API_URL_ = 'https://www.googleapis.com/drive/v3/files'
+    _UPLOAD_URL_ = 'https://www.googleapis.com/upload/drive/v3/files'
+
+    def __init__(self, credentials, pool_size, timeout, executor):
+        try:
+            import httpx
+        except ImportError:
+            raise ImproperlyConfigured(
+                'The asynchronous API of GoogleDriveStorage requires httpx, '
+                'install it with "pip install django-googledrive-storage[async]"'  # noqa: E501
+            )
+
+        self._credentials = credentials
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+            timeout=timeout,
+        )
+        self._refresh_lock = asyncio.Lock()
+        self._executor = executor
+
+    async def _authorization(self):
+        """
+        Authorization header, refreshing the token (in a worker thread) when
+        it is expired
+        """
+        if not self._credentials.valid:
+            async with self._refresh_lock:
+                if not self._credentials.valid:
+                    from google.auth.transport.requests import Request
+
+                    await asyncio.get_event_loop().run_in_executor(
+                        None, self._credentials.refresh, Request())
+        return 'Bearer {0}'.format(self._credentials.token)
+
+    async def request(self, method, url, headers=None, retry=True,
+                      **kwargs):
+        """
+        Issue an authorized request through the executor.
+        Error responses are raised as ``googleapiclient.errors.HttpError``,
+        like the blocking client does.
+
+        :param bool retry: Whether the request is retried when it fails because of rate limits or server errors
+        :returns: httpx.Response
+        """  # noqa: E501
+        headers = dict(headers or {})
+
+        async def send():
+            headers['authorization'] = await self._authorization()
+            response = await self._client.request(
+                method, url, headers=headers, **kwargs)
+            if response.status_code >= 400:
+                import httplib2
+                from googleapiclient.errors import HttpError
+
+                info = {k.lower(): v for k, v in response.headers.items()}
+                info['status'] = str(response.status_code)
+                raise HttpError(
+                    httplib2.Response(info), response.content, uri=url)
+            return response
+
+        return await self._executor.aexecute(send, retry=retry)
+
+    async def files(self, method, fileId=None, body=None, **params):
+        """
+        Call a method of the ``files`` resource with the same arguments of
+        the blocking client.
+
+        :param method: One of list, get, create, update, delete
+        :type method: string
+        :returns: dict - Decoded response
+        """
+        url = self._API_URL_
+        if fileId is not None:
+            url = '{0}/{1}'.format(url, fileId)
+        http_method = {
+            'list': 'GET', 'get': 'GET', 'create': 'POST',
+            'update': 'PATCH', 'delete': 'DELETE',
+        }[method]
+        response = await self.request(
+            http_method, url, params=params, json=body)
+        if not response.content:
+            return {}
+        return response.json()
+
+    async def create_permission(self, file_id, body):
+        """
+        Create a permission on a file or folder
+
+        :returns: dict - The created permission
+        """
+        response = await self.request(
+            'POST', '{0}/{1}/permissions'.format(self._API_URL_, file_id),
+            json=body)
+        return response.json()
+
+    async def list_permissions(self, file_id, fields):
+        """
+        Retrieve the permissions of a file or folder
+
+        :returns: dict - Decoded response
+        """
+        response = await self.request(
+            'GET', '{0}/{1}/permissions'.format(self._API_URL_, file_id),
+            params={'fields': fields})
+        return response.json()
+
+    async def download(self, file_id, start, end):
+        """
+        Download the bytes of a file between ``start`` and ``end``
+        (inclusive)
+
+        :returns: bytes
+        """
+        response = await self.request(
+            'GET', '{0}/{1}'.format(self._API_URL_, file_id),
+            params={'alt': 'media'},
+            headers={'range': 'bytes={0}-{1}'.format(start, end)})
+        return response.content
+
+    async def upload(self, body, fd, size, mime_type, fields,
+                     resumable, chunk_size, max_chunk_size,
+                     session_store=None, session_key=None, file_id=None):
+        """
+        Upload the content of a file object, with a single multipart request
+        when it is small or with a resumable session otherwise, whose chunks
+        grow with the measured throughput (see :func:`_adapt_chunk_size`).
+        When ``session_key`` is given, resumable sessions are tracked in
+        ``session_store`` like the blocking API does.
+        When ``file_id`` is given, the content is uploaded as a new revision
+        of that file instead of creating a new one.
+
+        :param body: Metadata of the new file
+        :type body: dict
+        :param fd: File object whose content had to be uploaded
+        :param size: Size of the content (measured when unknown)
+        :type size: int or None
+        :param mime_type: Mime type of the content
+        :type mime_type: string
+        :param fields: Fields of the new file returned by Google Drive
+        :type fields: string
+        :param bool resumable: Whether a resumable upload is used instead of a single request
+        :param int chunk_size: Size of the first chunk of resumable uploads
+        :param int max_chunk_size: Upper bound of the chunk size
+        :param session_store: Store of the resumable uploads in progress
+        :type session_store: gdstorage.storage.GoogleDriveUploadSessionStore
+        :param session_key: Key of the upload
+        :type session_key: string
+        :param file_id: Unique identifier of the file to be updated
+        :type file_id: string
+        :returns: dict - Data of the file
+        """  # noqa: E501
+        method, url = 'POST', self._UPLOAD_URL_
+        if file_id is not None:
+            method, url = 'PATCH', '{0}/{1}'.format(url, file_id)
+        if size is None:
+            size = fd.seek(0, io.SEEK_END)
+        fd.seek(0)
+        if not resumable:
+            boundary = '==gdstorage{0}=='.format(os.urandom(8).hex())
+            content = b''.join([
+                '--{0}\r\nContent-Type: application/json; charset=UTF-8'
+                '\r\n\r\n'.format(boundary).encode(),
+                json.dumps(body).encode(),
+                '\r\n--{0}\r\nContent-Type: {1}\r\n\r\n'.format(
+                    boundary, mime_type).encode(),
+                fd.read(),
+                '\r\n--{0}--'.format(boundary).encode(),
+            ])
+            response = await self.request(
+                method, url,
+                params={'uploadType': 'multipart', 'fields': fields},
+                headers={
+                    'content-type': 'multipart/related; boundary="{0}"'.format(
+                        boundary),
+                },
+                content=content)
+            return response.json()
+
+        from googleapiclient.errors import HttpError
+
+        session_url, offset = None, 0
+        if session_key is not None:
+            session = session_store.get(session_key)
+            if session is not None:
+                try:
+                    response = await self.request(
+                        'PUT', session['uri'],
+                        headers={'content-range': 'bytes */{0}'.format(size)})
+                except HttpError:
+                    # The session expired, a new one is started
+                    pass
+                else:
+                    if response.status_code != 308:
+                        session_store.delete(session_key)
+                        return response.json()
+                    session_url = session['uri']
+                    offset = self._committed(response)
+        if session_url is None:
+            response = await self.request(
+                method, url,
+                params={'uploadType': 'resumable', 'fields': fields},
+                headers={
+                    'x-upload-content-type': mime_type,
+                    'x-upload-content-length': str(size),
+                },
+                json=body)
+            session_url = response.headers['location']
+        attempt = 0
+        while True:
+            fd.seek(offset)
+            chunk = fd.read(chunk_size)
+            started = time.monotonic()
+            try:
+                response = await self.request(
+                    'PUT', session_url,
+                    headers={
+                        'content-range': 'bytes {0}-{1}/{2}'.format(
+                            offset, offset + len(chunk) - 1, size),
+                    },
+                    content=chunk, retry=False)
+            except HttpError as e:
+                # Part of the chunk may have been committed, so the
+                # upload continues from the offset reported by the session
+                delay = self._executor.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                response = await self.request(
+                    'PUT', session_url,
+                    headers={'content-range': 'bytes */{0}'.format(size)})
+            else:
+                attempt = 0
+            if response.status_code != 308:
+                if session_key is not None:
+                    session_store.delete(session_key)
+                return response.json()
+            offset = self._committed(response)
+            if session_key is not None:
+                session_store.set(
+                    session_key, {'uri': session_url, 'offset': offset})
+            chunk_size = _adapt_chunk_size(
+                chunk_size, time.monotonic() - started, max_chunk_size)
+
+    def _committed(self, response):
+        """
+        Number of bytes committed by Google Drive in a resumable session,
+        from the ``Range`` header of a 308 response
+
+        :returns: int
+        """
+        if 'range' not in response.headers:
+            return 0
+        return int(response.headers['range'].split('-')[1]) + 1
+
+
+class _AsyncGoogleDriveFile(object):
+    """
+    Read-only file returned by :meth:`GoogleDriveStorage.aopen`.
+    Its content is downloaded on demand with ranged requests, so it can be
+    read piecewise with ``await f.read(size)`` or iterated chunk by chunk
+    with ``async for``.
+
+    :param client: Client used to download the content
+    :type client: gdstorage.storage._AsyncDriveClient
+    :param file_id: Unique identifier of the file
+    :type file_id: string
+    :param name: Name of the file
+    :type name: string
+    :param int size: Size of the file
+    :param int chunk_size: Bytes downloaded with each request
+    """
+
+    def __init__(self, client, file_id, name, size, chunk_size):
+        self._client = client
+        self._file_id = file_id
+        self.name = name
+        self.size = size
+        self._chunk_size = chunk_size
+        self._position = 0
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError('negative seek position {0}'.format(offset))
+        self._position = offset
+        return self._position
+
+    async def read(self, size=-1):
+        """
+        Read up to ``size`` bytes (the whole remaining content when
+        negative)
+
+        :returns: bytes
+        """
+        end = self.size if size is None or size < 0 else min(
+            self.size, self._position + size)
+        parts = []
+        while self._position < end:
+            last = min(end, self._position + self._chunk_size) - 1
+            data = await self._client.download(
+                self._file_id, self._position, last)
+            if not data:
+                break
+            parts.append(data)
+            self._position += len(data)
+        return b''.join(parts)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        data = await self.read(self._chunk_size)
+        if not data:
+            raise StopAsyncIteration
+        return data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
 @deconstructible
 class GoogleDriveStorage(Storage):
     """
@@ -143,29 +1154,116 @@ class GoogleDriveStorage(Storage):
 
     _UNKNOWN_MIMETYPE_ = 'application/octet-stream'
     _GOOGLE_DRIVE_FOLDER_MIMETYPE_ = 'application/vnd.google-apps.folder'
+    _PATH_INDEX_KEY_ = 'gdstoragePath'
+    _CONTENT_HASH_KEY_ = 'gdstorageMd5'
+    _REFERENCES_KEY_ = 'gdstorageRefs'
+    # Maximum number of folders whose children are queried together
+    _TREE_QUERY_PARENTS_ = 50
+    # Maximum number of names looked up together by stat_many
+    _STAT_QUERY_NAMES_ = 50
+    # Fields requested for every folder met while walking a path
+    _FOLDER_FIELDS_ = ('id', 'name', 'mimeType')
+    # Fields requested for every file or folder a path points to
+    _FILE_FIELDS_ = (
+        'id', 'name', 'mimeType', 'parents', 'size', 'md5Checksum',
+        'webContentLink', 'createdTime', 'modifiedTime',
+    )
+    # Fields requested by the methods retrieving a single attribute
+    _SIZE_FIELDS_ = _FOLDER_FIELDS_ + ('size',)
+    _URL_FIELDS_ = _FOLDER_FIELDS_ + ('webContentLink',)
+    _CREATED_TIME_FIELDS_ = _FOLDER_FIELDS_ + ('createdTime',)
+    _MODIFIED_TIME_FIELDS_ = _FOLDER_FIELDS_ + ('modifiedTime',)
+    _CHECKSUM_FIELDS_ = _FOLDER_FIELDS_ + ('md5Checksum',)
     KEY_FILE_PATH = 'GOOGLE_DRIVE_STORAGE_JSON_KEY_FILE'
     KEY_FILE_CONTENT = 'GOOGLE_DRIVE_STORAGE_JSON_KEY_FILE_CONTENTS'
+    CACHE_MAX_ENTRIES = 'GOOGLE_DRIVE_STORAGE_CACHE_MAX_ENTRIES'
+    CACHE_TTL = 'GOOGLE_DRIVE_STORAGE_CACHE_TTL'
+    INDEX_PATHS = 'GOOGLE_DRIVE_STORAGE_INDEX_PATHS'
+    INDEX_FALLBACK = 'GOOGLE_DRIVE_STORAGE_INDEX_FALLBACK'
+    LEGACY_NAME_MATCH = 'GOOGLE_DRIVE_STORAGE_LEGACY_NAME_MATCH'
+    STREAM_DOWNLOADS = 'GOOGLE_DRIVE_STORAGE_STREAM_DOWNLOADS'
+    DOWNLOAD_CHUNK_SIZE = 'GOOGLE_DRIVE_STORAGE_DOWNLOAD_CHUNK_SIZE'
+    DOWNLOAD_BLOCK_SIZE = 'GOOGLE_DRIVE_STORAGE_DOWNLOAD_BLOCK_SIZE'
+    DOWNLOAD_CACHE_SIZE = 'GOOGLE_DRIVE_STORAGE_DOWNLOAD_CACHE_SIZE'
+    PARALLEL_DOWNLOAD_THRESHOLD = 'GOOGLE_DRIVE_STORAGE_PARALLEL_DOWNLOAD_THRESHOLD'  # noqa: E501
+    PARALLEL_DOWNLOAD_WORKERS = 'GOOGLE_DRIVE_STORAGE_PARALLEL_DOWNLOAD_WORKERS'  # noqa: E501
+    PARALLEL_DOWNLOAD_PART_SIZE = 'GOOGLE_DRIVE_STORAGE_PARALLEL_DOWNLOAD_PART_SIZE'  # noqa: E501
+    SPOOL_MAX_MEMORY = 'GOOGLE_DRIVE_STORAGE_SPOOL_MAX_MEMORY'
+    SPOOL_DIR = 'GOOGLE_DRIVE_STORAGE_SPOOL_DIR'
+    INHERIT_PERMISSIONS = 'GOOGLE_DRIVE_STORAGE_INHERIT_PERMISSIONS'
+    EXTRA_FIELDS = 'GOOGLE_DRIVE_STORAGE_EXTRA_FIELDS'
+    FOLDER_LOCK_CACHE = 'GOOGLE_DRIVE_STORAGE_FOLDER_LOCK_CACHE'
+    FOLDER_LOCK_TIMEOUT = 'GOOGLE_DRIVE_STORAGE_FOLDER_LOCK_TIMEOUT'
+    HTTP_POOL_SIZE = 'GOOGLE_DRIVE_STORAGE_HTTP_POOL_SIZE'
+    HTTP_TIMEOUT = 'GOOGLE_DRIVE_STORAGE_HTTP_TIMEOUT'
+    SAVE_CONCURRENCY = 'GOOGLE_DRIVE_STORAGE_SAVE_CONCURRENCY'
+    MULTIPART_THRESHOLD = 'GOOGLE_DRIVE_STORAGE_MULTIPART_THRESHOLD'
+    UPLOAD_CHUNK_SIZE = 'GOOGLE_DRIVE_STORAGE_UPLOAD_CHUNK_SIZE'
+    UPLOAD_MAX_CHUNK_SIZE = 'GOOGLE_DRIVE_STORAGE_UPLOAD_MAX_CHUNK_SIZE'
+    UPLOAD_SESSION_STORE = 'GOOGLE_DRIVE_STORAGE_UPLOAD_SESSION_STORE'
+    UPLOAD_SESSION_STORE_OPTIONS = 'GOOGLE_DRIVE_STORAGE_UPLOAD_SESSION_STORE_OPTIONS'  # noqa: E501
+    MAX_QPS = 'GOOGLE_DRIVE_STORAGE_MAX_QPS'
+    MAX_RETRIES = 'GOOGLE_DRIVE_STORAGE_MAX_RETRIES'
+    DEDUPLICATE = 'GOOGLE_DRIVE_STORAGE_DEDUPLICATE'
+    OVERWRITE = 'GOOGLE_DRIVE_STORAGE_OVERWRITE'
 
-    def __init__(self, json_keyfile_path=None, permissions=None):
+    def __init__(self, json_keyfile_path=None, permissions=None,
+                 cache_max_entries=None, cache_ttl=None, index_paths=None,
+                 index_fallback=None, legacy_name_match=None,
+                 stream_downloads=None, download_chunk_size=None,
+                 download_block_size=None, download_cache_size=None,
+                 parallel_download_threshold=None,
+                 parallel_download_workers=None,
+                 parallel_download_part_size=None, spool_max_memory=None,
+                 spool_dir=None, inherit_permissions=None, extra_fields=None,
+                 folder_lock_cache=None, folder_lock_timeout=None,
+                 http_pool_size=None, http_timeout=None,
+                 save_concurrency=None, multipart_threshold=None,
+                 upload_chunk_size=None, upload_max_chunk_size=None,
+                 upload_session_store=None, max_qps=None, max_retries=None,
+                 deduplicate=None, overwrite=None):
         """
-        Handles credentials and builds the google service.
+        Handles the storage configuration. Credentials are loaded and the
+        google service is built only when Google Drive is first used.
 
         :param json_keyfile_path: Path
+        :param cache_max_entries: Maximum number of resolved paths kept in memory (0 disables the cache)
+        :param cache_ttl: Seconds a resolved path is kept in memory
+        :param index_paths: Stamp created items with their path and resolve paths with a single query
+        :param index_fallback: Walk the path folder by folder when it is not found in the index
+        :param legacy_name_match: When no file has the exact name, return the first one whose name contains it
+        :param stream_downloads: Download file content lazily while it is read instead of downloading it when opened
+        :param download_chunk_size: Bytes fetched by every request while downloading
+        :param download_block_size: Bytes fetched by a random read on a streamed file
+        :param download_cache_size: Bytes of every streamed file kept in memory
+        :param parallel_download_threshold: Files of at least this size are downloaded in parallel parts when opened
+        :param parallel_download_workers: Number of parts downloaded concurrently
+        :param parallel_download_part_size: Bytes downloaded by every part
+        :param spool_max_memory: Bytes of a downloaded file kept in memory before spilling it to disk
+        :param spool_dir: Directory where downloaded files are spilled to disk
+        :param inherit_permissions: Apply permissions to folders only and let files inherit them
+        :param extra_fields: Additional Google Drive fields retrieved for every file
+        :param folder_lock_cache: Alias of the Django cache used to lock folder creation across processes
+        :param folder_lock_timeout: Seconds a folder creation lock is held at most
+        :param http_pool_size: Maximum number of connections to Google Drive kept alive
+        :param http_timeout: Seconds to wait for Google Drive before giving up a request
+        :param save_concurrency: Number of files uploaded concurrently by :meth:`save_many`
+        :param multipart_threshold: Size from which files are uploaded with resumable uploads instead of a single request
+        :param upload_chunk_size: Bytes sent by the first request of a resumable upload (multiple of 256 KiB)
+        :param upload_max_chunk_size: Bytes sent at most by every request of a resumable upload
+        :param upload_session_store: Store of the resumable uploads in progress, or dotted path of its class
+        :type upload_session_store: gdstorage.storage.GoogleDriveUploadSessionStore or string
+        :param max_qps: Maximum number of requests per second sent to Google Drive
+        :param max_retries: Maximum number of times a request failed because of rate limits or server errors is retried
+        :param deduplicate: Whether saving a content already in the target folder returns the existing file instead of uploading it again
+        :param overwrite: Whether saving to the name of an existing file uploads a new revision of it instead of creating another file
         :raise ValueError:
-        """
+        """  # noqa: E501
         settings_keyfile_path = getattr(settings, self.KEY_FILE_PATH, None)
         self._json_keyfile_path = json_keyfile_path or settings_keyfile_path
-
-        if self._json_keyfile_path:
-            credentials = Credentials.from_service_account_file(
-                self._json_keyfile_path,
-                scopes=['https://www.googleapis.com/auth/drive'],
-            )
-        else:
-            credentials = Credentials.from_service_account_info(
-                json.loads(os.environ[self.KEY_FILE_CONTENT]),
-                scopes=['https://www.googleapis.com/auth/drive'],
-            )
+        self._credentials_data = None
+        self._http = None
+        self._http_lock = threading.Lock()
 
         self._permissions = None
         if permissions is None:
@@ -186,7 +1284,182 @@ class GoogleDriveStorage(Storage):
                 # Ok, permissions are good
                 self._permissions = permissions
 
-        self._drive_service = build('drive', 'v3', credentials=credentials)
+        if cache_max_entries is None:
+            cache_max_entries = getattr(settings, self.CACHE_MAX_ENTRIES, 1024)
+        if cache_ttl is None:
+            cache_ttl = getattr(settings, self.CACHE_TTL, 60)
+        self._path_cache = _PathCache(cache_max_entries, cache_ttl)
+
+        if index_paths is None:
+            index_paths = getattr(settings, self.INDEX_PATHS, False)
+        if index_fallback is None:
+            index_fallback = getattr(settings, self.INDEX_FALLBACK, True)
+        self._index_paths = index_paths
+        self._index_fallback = index_fallback
+
+        if legacy_name_match is None:
+            legacy_name_match = getattr(
+                settings, self.LEGACY_NAME_MATCH, False)
+        self._legacy_name_match = legacy_name_match
+
+        if stream_downloads is None:
+            stream_downloads = getattr(settings, self.STREAM_DOWNLOADS, True)
+        if download_chunk_size is None:
+            download_chunk_size = getattr(
+                settings, self.DOWNLOAD_CHUNK_SIZE, 1024 * 1024 * 4)
+        if download_block_size is None:
+            download_block_size = getattr(
+                settings, self.DOWNLOAD_BLOCK_SIZE, 1024 * 64)
+        if download_cache_size is None:
+            download_cache_size = getattr(
+                settings, self.DOWNLOAD_CACHE_SIZE, 1024 * 1024 * 8)
+        self._stream_downloads = stream_downloads
+        self._download_chunk_size = download_chunk_size
+        self._download_block_size = download_block_size
+        self._download_cache_size = download_cache_size
+
+        if parallel_download_threshold is None:
+            parallel_download_threshold = getattr(
+                settings, self.PARALLEL_DOWNLOAD_THRESHOLD, None)
+        if parallel_download_workers is None:
+            parallel_download_workers = getattr(
+                settings, self.PARALLEL_DOWNLOAD_WORKERS, 4)
+        if parallel_download_part_size is None:
+            parallel_download_part_size = getattr(
+                settings, self.PARALLEL_DOWNLOAD_PART_SIZE, 1024 * 1024 * 8)
+        self._parallel_download_threshold = parallel_download_threshold
+        self._parallel_download_workers = parallel_download_workers
+        self._parallel_download_part_size = parallel_download_part_size
+
+        if spool_max_memory is None:
+            spool_max_memory = getattr(
+                settings, self.SPOOL_MAX_MEMORY, 1024 * 1024 * 10)
+        if spool_dir is None:
+            spool_dir = getattr(settings, self.SPOOL_DIR, None)
+        self._spool_max_memory = spool_max_memory
+        self._spool_dir = spool_dir
+
+        if inherit_permissions is None:
+            inherit_permissions = getattr(
+                settings, self.INHERIT_PERMISSIONS, False)
+        self._inherit_permissions = inherit_permissions
+        # Folders known to grant the storage permissions
+        self._permitted_folders = set()
+        self._permitted_folders_lock = threading.Lock()
+        # Names known to be taken while looking for an available name
+        self._local = threading.local()
+
+        if folder_lock_cache is None:
+            folder_lock_cache = getattr(settings, self.FOLDER_LOCK_CACHE, None)
+        if folder_lock_timeout is None:
+            folder_lock_timeout = getattr(
+                settings, self.FOLDER_LOCK_TIMEOUT, 30)
+        self._folder_lock_cache = folder_lock_cache
+        self._folder_lock_timeout = folder_lock_timeout
+        # Folder creations in progress, by path
+        self._folder_creations = {}
+        self._folder_creations_lock = threading.Lock()
+
+        if http_pool_size is None:
+            http_pool_size = getattr(settings, self.HTTP_POOL_SIZE, 10)
+        if http_timeout is None:
+            http_timeout = getattr(settings, self.HTTP_TIMEOUT, 60)
+        self._http_pool_size = http_pool_size
+        self._http_timeout = http_timeout
+        if save_concurrency is None:
+            save_concurrency = getattr(settings, self.SAVE_CONCURRENCY, 4)
+        self._save_concurrency = save_concurrency
+        if multipart_threshold is None:
+            multipart_threshold = getattr(
+                settings, self.MULTIPART_THRESHOLD, 5 * 1024 * 1024)
+        if upload_chunk_size is None:
+            upload_chunk_size = getattr(
+                settings, self.UPLOAD_CHUNK_SIZE, 8 * 1024 * 1024)
+        if upload_max_chunk_size is None:
+            upload_max_chunk_size = getattr(
+                settings, self.UPLOAD_MAX_CHUNK_SIZE, 64 * 1024 * 1024)
+        if upload_chunk_size <= 0 or \
+                upload_chunk_size % _UPLOAD_CHUNK_UNIT_ != 0:
+            raise ValueError(
+                'Upload chunk size must be a multiple of 256 KiB')
+        self._multipart_threshold = multipart_threshold
+        self._upload_chunk_size = upload_chunk_size
+        self._upload_max_chunk_size = max(
+            upload_chunk_size, upload_max_chunk_size)
+        if upload_session_store is None:
+            upload_session_store = getattr(
+                settings, self.UPLOAD_SESSION_STORE, None)
+        if isinstance(upload_session_store, str):
+            upload_session_store = import_string(upload_session_store)(
+                **getattr(settings, self.UPLOAD_SESSION_STORE_OPTIONS, {}))
+        self._upload_session_store = upload_session_store
+        if max_qps is None:
+            max_qps = getattr(settings, self.MAX_QPS, None)
+        if max_retries is None:
+            max_retries = getattr(settings, self.MAX_RETRIES, 5)
+        self._executor = _RequestExecutor(max_qps, max_retries)
+        if deduplicate is None:
+            deduplicate = getattr(settings, self.DEDUPLICATE, False)
+        self._deduplicate = deduplicate
+        if overwrite is None:
+            overwrite = getattr(settings, self.OVERWRITE, False)
+        self._overwrite = overwrite
+        # Clients of the asynchronous API, by event loop
+        self._async_clients = weakref.WeakKeyDictionary()
+
+        if extra_fields is None:
+            extra_fields = getattr(settings, self.EXTRA_FIELDS, ())
+        self._file_field_names = self._FILE_FIELDS_ + tuple(
+            f for f in extra_fields if f not in self._FILE_FIELDS_)
+        self._file_fields = ', '.join(self._file_field_names)
+
+    @property
+    def _credentials(self):
+        """
+        Credentials of the service account, loaded on first use
+
+        :rtype: google.oauth2.service_account.Credentials
+        """
+        if self._credentials_data is None:
+            from google.oauth2.service_account import Credentials
+
+            if self._json_keyfile_path:
+                self._credentials_data = Credentials.from_service_account_file(
+                    self._json_keyfile_path,
+                    scopes=['https://www.googleapis.com/auth/drive'],
+                )
+            else:
+                self._credentials_data = Credentials.from_service_account_info(
+                    json.loads(os.environ[self.KEY_FILE_CONTENT]),
+                    scopes=['https://www.googleapis.com/auth/drive'],
+                )
+        return self._credentials_data
+
+    @property
+    def _drive_service(self):
+        """
+        Google Drive service of the current thread, built on first use from
+        the discovery document bundled with the Google API client, so no
+        request is issued to retrieve it.
+        Services of all threads share a pool of keep-alive connections.
+        """
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            from googleapiclient.discovery import build
+
+            if self._http is None:
+                with self._http_lock:
+                    if self._http is None:
+                        self._http = _PooledHttp(
+                            self._credentials, self._http_pool_size,
+                            self._http_timeout,
+                        )
+            service = build(
+                'drive', 'v3', http=self._http, cache_discovery=False,
+                static_discovery=True,
+            )
+            self._local.service = service
+        return service
 
     def _split_path(self, p):
         """
@@ -200,6 +1473,39 @@ class GoogleDriveStorage(Storage):
         a, b = os.path.split(p)
         return (self._split_path(a) if len(a) and len(b) else []) + [b]
 
+    def _cache_key(self, split_path, parent_id=None):
+        """
+        Build the key used to store a resolved path into the path cache
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :param parent_id: Unique identifier of the folder the path is relative to
+        :type parent_id: string
+        :returns: tuple
+        """  # noqa: E501
+        return parent_id, '/'.join(split_path)
+
+    def _escape(self, value):
+        """
+        Escape a value to be used as string literal inside a query
+
+        :param value: Value to be escaped
+        :type value: string
+        :returns: string
+        """
+        return value.replace('\\', '\\\\').replace("'", "\\'")
+
+    def _path_index_value(self, split_path):
+        """
+        Compute the value stored into ``appProperties`` to index a path.
+        The path is hashed to respect the size limit of custom properties.
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :returns: string
+        """
+        return hashlib.sha1('/'.join(split_path).encode('utf-8')).hexdigest()
+
     def _get_or_create_folder(self, path, parent_id=None):
         """
         Create a folder on Google Drive.
@@ -212,13 +1518,96 @@ class GoogleDriveStorage(Storage):
         :type parent_id: string
         :returns: dict
         """
-        folder_data = self._check_file_exists(path, parent_id)
+        folder_data = self._check_file_exists(
+            path, parent_id, self._FOLDER_FIELDS_)
         if folder_data is not None:
             return folder_data
 
-        # Folder does not exists, have to create
+        # Folder does not exists, have to create.
+        # Only one thread creates it, the others wait for its result
         split_path = self._split_path(path)
+        key = self._cache_key(split_path, parent_id)
+        with self._folder_creations_lock:
+            creation = self._folder_creations.get(key)
+            leader = creation is None
+            if leader:
+                creation = Future()
+                self._folder_creations[key] = creation
+        if not leader:
+            return creation.result()
+        try:
+            folder_data = self._create_folder_locked(split_path, parent_id)
+        except BaseException as e:
+            creation.set_exception(e)
+            raise
+        else:
+            creation.set_result(folder_data)
+        finally:
+            with self._folder_creations_lock:
+                del self._folder_creations[key]
+        return folder_data
+
+    def _create_folder_locked(self, split_path, parent_id=None):
+        """
+        Create a folder, unless it has been created in the meanwhile,
+        holding a lock on the Django cache ``folder_lock_cache`` (if set) so
+        that other processes do not create the same folder.
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :param parent_id: Unique identifier for its parent (folder)
+        :type parent_id: string
+        :returns: dict
+        """
+        path = '/'.join(split_path)
+        if self._folder_lock_cache is None:
+            # A creation finished since the lookup caches its result, so
+            # Google Drive is asked again only if the cache is disabled
+            if self._path_cache.enabled:
+                folder_data = self._path_cache.get(
+                    self._cache_key(split_path, parent_id),
+                    self._FOLDER_FIELDS_, record=False)
+            else:
+                folder_data = self._check_file_exists(
+                    path, parent_id, self._FOLDER_FIELDS_)
+            if folder_data is None:
+                folder_data = self._create_folder(split_path, parent_id)
+            return folder_data
 
+        cache = caches[self._folder_lock_cache]
+        lock_key = 'gdstorage:folder:{0}'.format(hashlib.sha1(
+            '{0}:{1}'.format(parent_id, path).encode('utf-8')).hexdigest())
+        token = os.urandom(16).hex()
+        deadline = time.monotonic() + self._folder_lock_timeout
+        while not cache.add(lock_key, token, self._folder_lock_timeout):
+            # Another process is creating the folder, wait for it
+            time.sleep(0.5)
+            folder_data = self._check_file_exists(
+                path, parent_id, self._FOLDER_FIELDS_)
+            if folder_data is not None:
+                return folder_data
+            if time.monotonic() > deadline:
+                break
+        try:
+            folder_data = self._check_file_exists(
+                path, parent_id, self._FOLDER_FIELDS_)
+            if folder_data is None:
+                folder_data = self._create_folder(split_path, parent_id)
+            return folder_data
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def _create_folder(self, split_path, parent_id=None):
+        """
+        Create a folder on Google Drive, creating its parents if needed.
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :param parent_id: Unique identifier for its parent (folder)
+        :type parent_id: string
+        :returns: dict
+        """
         if split_path[:-1]:
             parent_path = os.path.join(*split_path[:-1])
             current_folder_data = self._get_or_create_folder(
@@ -238,80 +1627,452 @@ class GoogleDriveStorage(Storage):
             # the parent_id obtained by the user, if available
             if parent_id is not None:
                 meta_data['parents'] = [parent_id]
-        current_folder_data = self._drive_service.files().create(
-            body=meta_data).execute()
+        if self._index_paths and parent_id is None:
+            meta_data['appProperties'] = {
+                self._PATH_INDEX_KEY_: self._path_index_value(split_path)
+            }
+        current_folder_data = self._execute(
+            self._drive_service.files().create(
+                body=meta_data,
+                fields=', '.join(self._FOLDER_FIELDS_)).execute)
+        if self._inherit_permissions:
+            parent_folder_id = meta_data.get('parents', [None])[0]
+            if parent_folder_id not in self._permitted_folders:
+                # New folders inherit permissions from their parent,
+                # otherwise they had to be granted
+                self._create_permissions(
+                    current_folder_data['id'], self._permissions)
+            with self._permitted_folders_lock:
+                self._permitted_folders.add(current_folder_data['id'])
+        self._path_cache.set(
+            self._cache_key(split_path, parent_id), current_folder_data,
+            self._FOLDER_FIELDS_,
+        )
         return current_folder_data
 
-    def _check_file_exists(self, filename, parent_id=None):
+    def _check_file_exists(self, filename, parent_id=None, fields=None):
         """
         Check if a file with specific parameters exists in Google Drive.
+        Resolved paths (and every folder met along the way) are kept in the
+        path cache, so only the segments not already known are looked up.
+
         :param filename: File or folder to search
         :type filename: string
         :param parent_id: Unique identifier for its parent (folder)
         :type parent_id: string
+        :param fields: Google Drive fields needed (file fields and extra fields by default)
+        :type fields: tuple of string
         :returns: dict containing file / folder data if exists or None if does not exists
         """  # noqa: E501
+        return self._run(self._resolve(filename, parent_id, fields))
+
+    def _run(self, steps):
+        """
+        Execute the requests yielded by a lookup generator (such as
+        :meth:`_resolve`), sending their results back to it.
+        Lookups are written this way so that the same logic can be driven
+        either by the blocking client or by the asynchronous one.
+
+        :param steps: Generator yielding (method of files() resource, keyword arguments) tuples
+        :returns: The value returned by the generator
+        """  # noqa: E501
+        try:
+            method, kwargs = next(steps)
+            while True:
+                result = self._execute(getattr(
+                    self._drive_service.files(), method)(**kwargs).execute)
+                method, kwargs = steps.send(result)
+        except StopIteration as e:
+            return e.value
+
+    def _resolve(self, filename, parent_id=None, fields=None):
+        """
+        Lookup generator behind :meth:`_check_file_exists`, see :meth:`_run`
+        """
+        if fields is None:
+            fields = self._file_field_names
         if len(filename) == 0:
             # This is the lack of directory at the beginning of a 'file.txt'
             # Since the target file lacks directories, the assumption
             # is that it belongs at '/'
-            return self._drive_service.files().get(fileId='root').execute()
+            root_data = self._path_cache.get((None, ''), fields)
+            if root_data is None:
+                root_data = yield 'get', {
+                    'fileId': 'root', 'fields': ', '.join(fields),
+                }
+                self._path_cache.set((None, ''), root_data, fields)
+            return root_data
         split_filename = self._split_path(filename)
-        if len(split_filename) > 1:
+        file_data = self._path_cache.get(
+            self._cache_key(split_filename, parent_id), fields)
+        if file_data is not None:
+            return file_data
+
+        if self._index_paths and parent_id is None:
+            file_data = yield from self._find_indexed(split_filename, fields)
+            if file_data is not None or not self._index_fallback:
+                if file_data is not None:
+                    self._path_cache.set(
+                        self._cache_key(split_filename), file_data, fields)
+                return file_data
+
+        # Start from the deepest folder that has already been resolved
+        depth, current_id = 0, parent_id
+        for i in range(len(split_filename) - 1, 0, -1):
+            folder_data = self._path_cache.get(
+                self._cache_key(split_filename[:i], parent_id),
+                self._FOLDER_FIELDS_, record=False)
+            if folder_data is not None:
+                depth, current_id = i, folder_data['id']
+                break
+
+        for i in range(depth, len(split_filename) - 1):
             # This is an absolute path with folder inside
-            # First check if the first element exists as a folder
-            # If so call the method recursively with next portion of path
+            # First check if the element exists as a folder
+            # If so continue with next portion of path
             # Otherwise the path does not exists hence
             # the file does not exists
             q = "mimeType = '{0}' and name = '{1}'".format(
-                self._GOOGLE_DRIVE_FOLDER_MIMETYPE_, split_filename[0],
+                self._GOOGLE_DRIVE_FOLDER_MIMETYPE_,
+                self._escape(split_filename[i]),
             )
-            if parent_id is not None:
-                q = "{0} and '{1}' in parents".format(q, parent_id)
-            results = self._drive_service.files().list(
-                q=q, fields='nextPageToken, files(*)').execute()
+            if current_id is not None:
+                q = "{0} and '{1}' in parents".format(q, current_id)
+            results = yield 'list', {
+                'q': q,
+                'fields': 'files({0})'.format(', '.join(self._FOLDER_FIELDS_)),
+            }
             items = results.get('files', [])
+            folder_data = None
             for item in items:
-                if item['name'] == split_filename[0]:
+                if item['name'] == split_filename[i]:
                     # Assuming every folder has a single parent
-                    return self._check_file_exists(
-                        os.path.sep.join(split_filename[1:]), item['id'])
-            return None
+                    folder_data = item
+                    break
+            if folder_data is None:
+                return None
+            self._path_cache.set(
+                self._cache_key(split_filename[:i + 1], parent_id),
+                folder_data, self._FOLDER_FIELDS_,
+            )
+            current_id = folder_data['id']
+
         # This is a file, checking if exists
-        q = "name = '{0}'".format(split_filename[0])
+        file_data = yield from self._find_file(
+            split_filename[-1], current_id, fields)
+        if file_data is not None:
+            self._path_cache.set(
+                self._cache_key(split_filename, parent_id), file_data, fields)
+        return file_data
+
+    def _find_indexed(self, split_filename, fields):
+        """
+        Lookup generator searching a file or folder by its complete path
+        using the index stored in ``appProperties``, issuing a single query
+        whatever the path depth.
+
+        :param split_filename: Path splitted by :meth:`_split_path`
+        :type split_filename: list
+        :param fields: Google Drive fields retrieved
+        :type fields: tuple of string
+        :returns: dict containing file / folder data if exists or None if does not exists
+        """  # noqa: E501
+        q = "appProperties has {{ key='{0}' and value='{1}' }}".format(
+            self._PATH_INDEX_KEY_, self._path_index_value(split_filename),
+        )
+        results = yield 'list', {
+            'q': q, 'fields': 'files({0})'.format(', '.join(fields)),
+        }
+        items = results.get('files', [])
+        if len(items) > 0:
+            return items[0]
+        return None
+
+    def backfill_path_index(self, path=''):
+        """
+        Stamp every file and folder below ``path`` with the ``appProperties``
+        used to resolve paths with a single query.
+        It is meant to migrate trees created before enabling ``index_paths``.
+
+        :param path: Folder whose content had to be indexed (empty for the whole drive)
+        :type path: string
+        :returns: int - Number of items that have been updated
+        """  # noqa: E501
+        path = path.strip('/')
+        folder_data = self._check_file_exists(
+            path, fields=self._FOLDER_FIELDS_)
+        if folder_data is None:
+            return 0
+        updated = 0
+        pending = [(self._split_path(path) if path else [], folder_data['id'])]
+        while pending:
+            split_path, folder_id = pending.pop()
+            params = {
+                'q': "'{0}' in parents".format(folder_id),
+                'fields': 'nextPageToken, files(id, name, mimeType, appProperties)',  # noqa: E501
+                'pageSize': 1000,
+            }
+            while True:
+                results = self._execute(
+                    self._drive_service.files().list(**params).execute)
+                for item in results.get('files', []):
+                    item_path = split_path + [item['name']]
+                    value = self._path_index_value(item_path)
+                    properties = item.get('appProperties', {})
+                    if properties.get(self._PATH_INDEX_KEY_) != value:
+                        self._execute(self._drive_service.files().update(
+                            fileId=item['id'],
+                            body={
+                                'appProperties': {self._PATH_INDEX_KEY_: value}
+                            }).execute)
+                        updated += 1
+                    if item['mimeType'] == self._GOOGLE_DRIVE_FOLDER_MIMETYPE_:
+                        pending.append((item_path, item['id']))
+                params['pageToken'] = results.get('nextPageToken')
+                if not params['pageToken']:
+                    break
+        return updated
+
+    def _find_file(self, name, parent_id, fields):
+        """
+        Lookup generator searching a file or folder by its exact name.
+        When ``legacy_name_match`` is enabled and nothing matches, the first
+        page of the parent content (or of the whole drive) is scanned for a
+        name containing the searched one, as older releases did.
+
+        :param name: Name of the file or folder
+        :type name: string
+        :param parent_id: Unique identifier for its parent (folder)
+        :type parent_id: string
+        :param fields: Google Drive fields retrieved
+        :type fields: tuple of string
+        :returns: dict containing file / folder data if exists or None if does not exists
+        """  # noqa: E501
+        q = "name = '{0}'".format(self._escape(name))
         if parent_id is not None:
             q = "{0} and '{1}' in parents".format(q, parent_id)
-        results = self._drive_service.files().list(
-            q=q, fields='nextPageToken, files(*)').execute()
+        results = yield 'list', {
+            'q': q, 'fields': 'files({0})'.format(', '.join(fields)),
+        }
         items = results.get('files', [])
         if len(items) > 0:
             return items[0]
+        if not self._legacy_name_match:
+            return None
         q = '' if parent_id is None else "'{0}' in parents".format(parent_id)
-        results = self._drive_service.files().list(
-            q=q, fields='nextPageToken, files(*)').execute()
+        results = yield 'list', {
+            'q': q, 'fields': 'files({0})'.format(', '.join(fields)),
+        }
         items = results.get('files', [])
         for item in items:
-            if split_filename[0] in item['name']:
+            if name in item['name']:
                 return item
         return None
 
+    def cache_info(self):
+        """
+        Report statistics about the path cache, in the same fashion of
+        :func:`functools.lru_cache`
+
+        :returns: Named tuple with hits, misses, maxsize and currsize
+        :rtype: gdstorage.storage.GoogleDriveCacheInfo
+        """
+        return self._path_cache.info()
+
+    def cache_clear(self):
+        """
+        Empty the path cache and reset its statistics
+        """
+        self._path_cache.clear()
+
+    def request_stats(self):
+        """
+        Report how many requests have been sent to Google Drive, how many
+        of them have been delayed to stay below ``max_qps`` and how many
+        retries have been issued
+
+        :returns: Named tuple with requests, throttled and retried
+        :rtype: gdstorage.storage.GoogleDriveRequestStats
+        """
+        return self._executor.stats()
+
+    def _execute(self, call, count=1):
+        """
+        Issue requests through the request executor, which throttles and
+        retries them (see :class:`_RequestExecutor`)
+
+        :param call: Callable issuing the requests (e.g. ``request.execute``)
+        :param int count: Number of requests issued by the callable
+        :returns: The result of the callable
+        """
+        return self._executor.execute(call, count)
+
+    def save_many(self, items, max_length=None, max_workers=None):
+        """
+        Save many files concurrently, on a bounded pool of threads.
+        The folders of all the files are resolved (or created) once before
+        uploading them, and files with the same name are saved one after the
+        other, so that each of them gets an available name.
+
+        :param items: Files to be saved, as (name, content) tuples
+        :type items: iterable
+        :param int max_length: Maximum length of the names of the saved files
+        :param int max_workers: Number of files uploaded concurrently (``save_concurrency`` by default)
+        :returns: The outcome of every file, in the same order of items
+        :rtype: list of gdstorage.storage.GoogleDriveSaveResult
+        """  # noqa: E501
+        items = list(items)
+        results = [None] * len(items)
+        groups = OrderedDict()
+        for i, (name, _) in enumerate(items):
+            folder_path = os.path.sep.join(self._split_path(os.path.join(
+                settings.GOOGLE_DRIVE_STORAGE_MEDIA_ROOT, name))[:-1])
+            groups.setdefault((folder_path, name), []).append(i)
+        folder_errors = {}
+
+        def resolve_folder(folder_path):
+            try:
+                self._get_or_create_folder(folder_path)
+            except Exception as e:
+                folder_errors[folder_path] = e
+
+        def save_group(key):
+            folder_path, name = key
+            for i in groups[key]:
+                error = folder_errors.get(folder_path)
+                saved_name = None
+                if error is None:
+                    try:
+                        saved_name = self.save(
+                            name, items[i][1], max_length=max_length)
+                    except Exception as e:
+                        error = e
+                results[i] = GoogleDriveSaveResult(name, saved_name, error)
+
+        with ThreadPoolExecutor(
+                max_workers=max_workers or self._save_concurrency) as executor:
+            list(executor.map(
+                resolve_folder, set(folder_path for folder_path, _ in groups)))
+            list(executor.map(save_group, groups))
+        return results
+
     # Methods that had to be implemented
     # to create a valid storage for Django
 
-    def _open(self, name, mode='rb'):
-        """For more details see
-        https://developers.google.com/drive/api/v3/manage-downloads?hl=id#download_a_file_stored_on_google_drive
-        """  # noqa: E501
-        file_data = self._check_file_exists(name)
-        request = self._drive_service.files().get_media(
-            fileId=file_data['id'])
-        fh = BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            _, done = downloader.next_chunk()
+    def _open(self, name, mode='rb'):
+        """
+        Open a file for reading. Unless ``stream_downloads`` is disabled,
+        the content is downloaded lazily while it is read and the returned
+        file supports random access through ``seek``.
+
+        For more details see
+        https://developers.google.com/drive/api/v3/manage-downloads?hl=id#download_a_file_stored_on_google_drive
+        """  # noqa: E501
+        file_data = self._check_file_exists(name, fields=self._SIZE_FIELDS_)
+        if file_data is None:
+            raise FileNotFoundError(
+                'File {0} does not exist on Google Drive'.format(name))
+        size = file_data.get('size')
+        if size is not None:
+            size = int(size)
+        if self._parallel_download_threshold is not None and \
+                size is not None and \
+                size >= self._parallel_download_threshold:
+            fh = self._download_parallel(file_data['id'], size)
+        elif self._stream_downloads:
+            fh = io.BufferedReader(
+                _GoogleDriveStream(
+                    self._drive_service, file_data['id'], size,
+                    self._download_chunk_size, self._download_block_size,
+                    self._download_cache_size, self._execute,
+                ),
+                buffer_size=self._download_block_size,
+            )
+        else:
+            from googleapiclient.http import MediaIoBaseDownload
+
+            request = self._drive_service.files().get_media(
+                fileId=file_data['id'])
+            fh = self._spooled_file()
+            downloader = MediaIoBaseDownload(fh, request)
+            done = False
+            while done is False:
+                _, done = self._execute(downloader.next_chunk)
+            fh.seek(0)
+        f = File(fh, name)
+        if size is not None:
+            f.size = size
+        return f
+
+    def _spooled_file(self):
+        """
+        Create the buffer used to hold a whole downloaded file.
+        It is kept in memory up to ``spool_max_memory`` bytes, then it is
+        moved to a temporary file in ``spool_dir``.
+
+        :returns: tempfile.SpooledTemporaryFile
+        """
+        return tempfile.SpooledTemporaryFile(
+            max_size=self._spool_max_memory, dir=self._spool_dir)
+
+    def _download_parallel(self, file_id, size):
+        """
+        Download a whole file fetching several byte ranges concurrently.
+        Every part is written at its offset into a preallocated spooled
+        temporary file.
+
+        :param file_id: Unique identifier of the file to download
+        :type file_id: string
+        :param size: Size of the file in bytes
+        :type size: int
+        :returns: Temporary file positioned at its beginning
+        """
+        fh = self._spooled_file()
+        fh.truncate(size)
+        lock = threading.Lock()
+
+        def download_part(start):
+            end = min(start + self._parallel_download_part_size, size) - 1
+            request = self._drive_service.files().get_media(fileId=file_id)
+            request.headers['range'] = 'bytes={0}-{1}'.format(start, end)
+            data = self._execute(request.execute)
+            with lock:
+                fh.seek(start)
+                fh.write(data)
+
+        try:
+            with ThreadPoolExecutor(
+                    max_workers=self._parallel_download_workers) as executor:
+                parts = executor.map(
+                    download_part,
+                    range(0, size, self._parallel_download_part_size),
+                )
+                # Consume results to raise any error
+                for _ in parts:
+                    pass
+        except BaseException:
+            fh.close()
+            raise
         fh.seek(0)
-        return File(fh, name)
+        return fh
+
+    def _overwrite_target(self, name, file_data):
+        """
+        Check whether the file found at ``name`` can be overwritten: folders
+        cannot, and neither can files matched only by ``legacy_name_match``.
+
+        :param name: Name of the file being saved
+        :type name: string
+        :param file_data: Metadata found at ``name``
+        :type file_data: dict or None
+        :returns: dict or None
+        """
+        if file_data is None or \
+                file_data['name'] != self._split_path(name)[-1]:
+            return None
+        if file_data['mimeType'] == self._GOOGLE_DRIVE_FOLDER_MIMETYPE_:
+            return None
+        return file_data
 
     def _save(self, name, content):
         name = os.path.join(settings.GOOGLE_DRIVE_STORAGE_MEDIA_ROOT, name)
@@ -323,34 +2084,397 @@ class GoogleDriveStorage(Storage):
         mime_type, _ = mimetypes.guess_type(name)
         if mime_type is None:
             mime_type = self._UNKNOWN_MIMETYPE_
-        media_body = MediaIoBaseUpload(
-            content.file, mime_type, resumable=True, chunksize=1024 * 512)
+        # Small files are sent with a single multipart request
+        size = content.size
+        resumable = size is None or size >= self._multipart_threshold
+        md5 = None
+        if self._deduplicate or \
+                (resumable and self._upload_session_store is not None):
+            md5 = self._content_md5(content.file)
+        existing_data = None
+        if self._overwrite:
+            existing_data = self._overwrite_target(
+                name, self._check_file_exists(
+                    name, fields=self._CHECKSUM_FIELDS_))
+        if existing_data is not None:
+            if md5 is not None and existing_data.get('md5Checksum') == md5:
+                # The file already has the same content
+                return existing_data['name']
+        elif self._deduplicate:
+            file_data = self._run(self._find_duplicate(parent_id, md5, size))
+            if file_data is not None:
+                # The same content is already in the folder
+                self._run(self._change_references(file_data['id'], 1))
+                self._path_cache.set(
+                    self._cache_key(self._split_path(name)[:-1] + [
+                        file_data['name']]),
+                    file_data, self._file_field_names)
+                return file_data['name']
+        media_body = _adaptive_media_upload_class()(
+            content.file, mime_type, chunksize=self._upload_chunk_size,
+            resumable=resumable)
+        body = self._upload_metadata(
+            self._split_path(name), mime_type, parent_id, md5)
+        session_key = None
+        if resumable and self._upload_session_store is not None:
+            session_key = self._upload_session_key(
+                self._split_path(name), md5)
+        file_data = None
+        if existing_data is not None:
+            from googleapiclient.errors import HttpError
+
+            # Upload the content as a new revision of the existing file
+            request = self._drive_service.files().update(
+                fileId=existing_data['id'],
+                body={
+                    k: v for k, v in body.items()
+                    if k not in ('name', 'parents')
+                },
+                media_body=media_body,
+                fields=self._file_fields)
+            try:
+                file_data = self._send_upload(
+                    request, media_body, session_key)
+            except HttpError as e:
+                # The file has been deleted in the meanwhile
+                if e.resp.status != 404:
+                    raise
+                self._path_cache.invalidate(
+                    '/'.join(self._split_path(name)), existing_data['id'])
+                existing_data = None
+        if file_data is None:
+            request = self._drive_service.files().create(
+                body=body,
+                media_body=media_body,
+                fields=self._file_fields)
+            file_data = self._send_upload(request, media_body, session_key)
+        self._path_cache.set(
+            self._cache_key(self._split_path(name)), file_data,
+            self._file_field_names)
+
+        # Setting up permissions of new files, unless they are inherited
+        # from the folder
+        if existing_data is None:
+            if self._inherit_permissions and folder_path:
+                self._ensure_folder_permissions(parent_id)
+            else:
+                self._create_permissions(file_data['id'], self._permissions)
+
+        return file_data.get('originalFilename', file_data.get('name'))
+
+    def _send_upload(self, request, media_body, session_key=None):
+        """
+        Send the request uploading a content, chunk by chunk when the upload
+        is resumable (see :meth:`_upload_resumable`)
+
+        :param request: Request creating or updating the file
+        :type request: googleapiclient.http.HttpRequest
+        :param media_body: Content of the file (see :func:`_adaptive_media_upload_class`)
+        :type media_body: googleapiclient.http.MediaIoBaseUpload
+        :param session_key: Key of the upload (see :meth:`_upload_session_key`)
+        :type session_key: string
+        :returns: dict - Data of the file
+        """  # noqa: E501
+        if media_body.resumable():
+            return self._upload_resumable(request, media_body, session_key)
+        return self._execute(request.execute)
+
+    def _upload_resumable(self, request, media_body, session_key=None):
+        """
+        Send a resumable upload chunk by chunk, growing the chunks with the
+        measured throughput (see :func:`_adapt_chunk_size`).
+        When ``session_key`` is given, the session is kept in the upload
+        session store while the upload is in progress, and a session left
+        there by a failed upload is resumed from its last committed byte.
+
+        :param request: Request creating or updating the file
+        :type request: googleapiclient.http.HttpRequest
+        :param media_body: Content of the file (see :func:`_adaptive_media_upload_class`)
+        :type media_body: googleapiclient.http.MediaIoBaseUpload
+        :param session_key: Key of the upload (see :meth:`_upload_session_key`)
+        :type session_key: string
+        :returns: dict - Data of the file
+        """  # noqa: E501
+        file_data = None
+        if session_key is not None:
+            session = self._upload_session_store.get(session_key)
+            if session is not None:
+                file_data = self._resume_upload(request, session['uri'])
+        chunk_size = self._upload_chunk_size
+        while file_data is None:
+            started = time.monotonic()
+            _, file_data = self._execute(request.next_chunk)
+            chunk_size = _adapt_chunk_size(
+                chunk_size, time.monotonic() - started,
+                self._upload_max_chunk_size)
+            media_body.set_chunksize(chunk_size)
+            if session_key is not None and file_data is None:
+                self._upload_session_store.set(session_key, {
+                    'uri': request.resumable_uri,
+                    'offset': request.resumable_progress,
+                })
+        if session_key is not None:
+            self._upload_session_store.delete(session_key)
+        return file_data
+
+    def _resume_upload(self, request, uri):
+        """
+        Ask Google Drive the status of an upload session and point the
+        request to it, so that the upload continues from the last byte that
+        has been committed.
+        Expired sessions are ignored, so a new one is started.
+
+        :param request: Request creating the file
+        :type request: googleapiclient.http.HttpRequest
+        :param uri: Address of the upload session
+        :type uri: string
+        :returns: dict - Data of the new file, if the upload was already completed
+        """  # noqa: E501
+        from googleapiclient.errors import HttpError
+
+        def query_status():
+            resp, content = request.http.request(uri, method='PUT', headers={
+                'Content-Range': 'bytes */{0}'.format(
+                    request.resumable.size()),
+                'Content-Length': '0',
+            })
+            if resp.status not in (200, 201, 308, 404, 410):
+                # Raised so that the request executor retries it
+                raise HttpError(resp, content, uri=uri)
+            return resp, content
+
+        resp, content = self._execute(query_status)
+        if resp.status in (200, 201):
+            return request.postproc(resp, content)
+        if resp.status == 308:
+            request.resumable_uri = uri
+            request.resumable_progress = 0
+            if 'range' in resp:
+                request.resumable_progress = int(
+                    resp['range'].split('-')[1]) + 1
+        return None
+
+    def _upload_session_key(self, split_name, md5):
+        """
+        Key of the upload of a content to a path, made by the path and the
+        MD5 checksum of the content, so that an upload is resumed only if
+        the content did not change.
+
+        :param split_name: Path splitted by :meth:`_split_path`
+        :type split_name: list
+        :param md5: MD5 checksum of the content (see :meth:`_content_md5`)
+        :type md5: string
+        :returns: string
+        """
+        return hashlib.sha1('{0}:{1}'.format(
+            '/'.join(split_name), md5).encode()).hexdigest()
+
+    def _content_md5(self, fd):
+        """
+        MD5 checksum of the content of a file object, as computed by Google
+        Drive (``md5Checksum``)
+
+        :param fd: File object
+        :returns: string
+        """
+        md5 = hashlib.md5()
+        fd.seek(0)
+        for block in iter(lambda: fd.read(1024 * 1024), b''):
+            md5.update(block)
+        fd.seek(0)
+        return md5.hexdigest()
+
+    def _find_duplicate(self, parent_id, md5, size=None):
+        """
+        Lookup generator searching a folder for a file with the given
+        content, through the checksum stored in its ``appProperties`` when
+        it was uploaded (see :meth:`_run`).
+        The checksum computed by Google Drive and the size are verified too.
+
+        :param parent_id: Unique identifier of the folder
+        :type parent_id: string
+        :param md5: MD5 checksum of the content
+        :type md5: string
+        :param size: Size of the content, if known
+        :type size: int
+        :returns: dict containing file data if exists or None if does not exists
+        """  # noqa: E501
+        q = "'{0}' in parents and appProperties has {{ key='{1}' and value='{2}' }} and trashed = false".format(  # noqa: E501
+            parent_id, self._CONTENT_HASH_KEY_, md5)
+        results = yield 'list', {
+            'q': q, 'fields': 'files({0})'.format(self._file_fields),
+        }
+        for item in results.get('files', []):
+            if item.get('md5Checksum') != md5:
+                continue
+            if size is not None and int(item.get('size', -1)) != size:
+                continue
+            return item
+        return None
+
+    def _change_references(self, file_id, delta):
+        """
+        Lookup generator changing the number of saves sharing a file through
+        deduplication, stored in its ``appProperties`` (see :meth:`_run`).
+        Files without it are referenced once.
+
+        :param file_id: Unique identifier of the file
+        :type file_id: string
+        :param int delta: Number of references added (negative to remove them)
+        :returns: int - Number of references left
+        """
+        file_data = yield 'get', {'fileId': file_id, 'fields': 'appProperties'}
+        references = int(file_data.get('appProperties', {}).get(
+            self._REFERENCES_KEY_, 1)) + delta
+        if references > 0:
+            yield 'update', {
+                'fileId': file_id,
+                'body': {
+                    'appProperties': {self._REFERENCES_KEY_: str(references)}
+                },
+                'fields': 'id',
+            }
+        return references
+
+    def _upload_metadata(self, split_name, mime_type, parent_id=None,
+                         md5=None):
+        """
+        Metadata of a file being uploaded
+
+        :param split_name: Path splitted by :meth:`_split_path`
+        :type split_name: list
+        :param mime_type: Mime type of the file
+        :type mime_type: string
+        :param parent_id: Unique identifier of the folder containing the file
+        :type parent_id: string
+        :param md5: MD5 checksum of the content, stored when deduplicating
+        :type md5: string
+        :returns: dict
+        """
         body = {
-            'name': self._split_path(name)[-1],
+            'name': split_name[-1],
             'mimeType': mime_type
         }
+        app_properties = {}
+        if self._index_paths:
+            app_properties[self._PATH_INDEX_KEY_] = self._path_index_value(
+                split_name)
+        if self._deduplicate and md5 is not None:
+            app_properties[self._CONTENT_HASH_KEY_] = md5
+        if app_properties:
+            body['appProperties'] = app_properties
         # Set the parent folder.
         if parent_id:
             body['parents'] = [parent_id]
-        file_data = self._drive_service.files().create(
-            body=body,
-            media_body=media_body).execute()
+        return body
+
+    def _create_permissions(self, file_id, permissions):
+        """
+        Apply permissions to a file or folder.
+        When there are several permissions, they are sent as a single batch
+        request instead of issuing a request for each one.
+
+        :param file_id: Unique identifier of the file or folder
+        :type file_id: string
+        :param permissions: Permissions to apply
+        :type permissions: list of gdstorage.GoogleDriveFilePermission
+        :raise gdstorage.storage.GoogleDrivePermissionError: if any permission could not be applied
+        """  # noqa: E501
+        if len(permissions) == 0:
+            return
+        if len(permissions) == 1:
+            self._execute(self._drive_service.permissions().create(
+                fileId=file_id, body={**permissions[0].raw}).execute)
+            return
 
-        # Setting up permissions
-        for p in self._permissions:
-            self._drive_service.permissions().create(
-                fileId=file_data['id'], body={**p.raw}).execute()
+        failed = []
+        attempt = 0
+        while permissions:
+            errors = []
 
-        return file_data.get('originalFilename', file_data.get('name'))
+            def callback(request_id, response, exception):
+                if exception is not None:
+                    errors.append((permissions[int(request_id)], exception))
+
+            batch = self._drive_service.new_batch_http_request(
+                callback=callback)
+            for i, p in enumerate(permissions):
+                batch.add(
+                    self._drive_service.permissions().create(
+                        fileId=file_id, body={**p.raw}),
+                    request_id=str(i),
+                )
+            self._execute(batch.execute, len(permissions))
+            # Only the requests failed because of rate limits or server
+            # errors are sent again
+            retryable = [
+                (p, e) for p, e in errors if self._executor.is_retryable(e)]
+            failed.extend((p, e) for p, e in errors if (p, e) not in retryable)
+            delay = None
+            if retryable:
+                delay = self._executor.retry_delay(retryable[0][1], attempt)
+            if delay is None:
+                failed.extend(retryable)
+                break
+            time.sleep(delay)
+            attempt += 1
+            permissions = [p for p, _ in retryable]
+        if failed:
+            raise GoogleDrivePermissionError(file_id, failed)
+
+    def _ensure_folder_permissions(self, folder_id):
+        """
+        Make sure a folder grants the storage permissions, so that files
+        created inside it inherit them. Permissions of each folder are
+        verified (and repaired if needed) only once.
+
+        :param folder_id: Unique identifier of the folder
+        :type folder_id: string
+        """
+        if folder_id in self._permitted_folders:
+            return
+        results = self._execute(self._drive_service.permissions().list(
+            fileId=folder_id,
+            fields='permissions(type, role, emailAddress)').execute)
+        self._create_permissions(
+            folder_id, self._missing_permissions(results))
+        with self._permitted_folders_lock:
+            self._permitted_folders.add(folder_id)
+
+    def _missing_permissions(self, results):
+        """
+        Storage permissions not granted by a folder
+
+        :param results: Permissions of the folder returned by Google Drive
+        :type results: dict
+        :returns: list of gdstorage.GoogleDriveFilePermission
+        """
+        granted = set(
+            (p['role'], p['type'], p.get('emailAddress', '').lower())
+            for p in results.get('permissions', [])
+        )
+        return [
+            p for p in self._permissions
+            if (p.role.value, p.type.value, (p.value or '').lower())
+            not in granted
+        ]
 
     def delete(self, name):
         """
         Deletes the specified file from the storage system.
+        When deduplicating, a file shared by several saves is only deleted
+        when its last reference is.
         """
-        file_data = self._check_file_exists(name)
+        file_data = self._check_file_exists(
+            name, fields=self._FOLDER_FIELDS_)
         if file_data is not None:
-            self._drive_service.files().delete(
-                fileId=file_data['id']).execute()
+            if self._deduplicate and self._run(
+                    self._change_references(file_data['id'], -1)) > 0:
+                return
+            self._execute(self._drive_service.files().delete(
+                fileId=file_data['id']).execute)
+            self._path_cache.invalidate(
+                '/'.join(self._split_path(name)), file_data['id'])
 
     def exists(self, name):
         """
@@ -358,7 +2482,203 @@ class GoogleDriveStorage(Storage):
         in the storage system, or False if the name is available for
         a new file.
         """
-        return self._check_file_exists(name) is not None
+        taken_names = getattr(self._local, 'taken_names', None)
+        if taken_names is not None:
+            dir_name, names = taken_names
+            name_dir, file_name = os.path.split(name)
+            if name_dir == dir_name:
+                return file_name in names
+        return self._check_file_exists(
+            name, fields=self._FOLDER_FIELDS_) is not None
+
+    def get_available_name(self, name, max_length=None):
+        """
+        Returns a filename that's free on the target storage system.
+        Names in the target folder are retrieved once, so alternative names
+        are checked locally instead of issuing a lookup for each of them;
+        the chosen name is then verified with a single query.
+        """
+        name = str(name).replace('\\', '/')
+        dir_name, file_name = os.path.split(name)
+        if self._overwrite:
+            # Existing files are overwritten, so every name is available
+            # (names longer than max_length are still truncated by Django)
+            self._local.taken_names = (dir_name, set())
+            try:
+                return super().get_available_name(name, max_length=max_length)
+            finally:
+                self._local.taken_names = None
+        if not dir_name:
+            # Files without folder are searched on the whole drive
+            return super().get_available_name(name, max_length=max_length)
+        file_root = file_name.split('.', 1)[0]
+        names = set()
+        folder_data = self._check_file_exists(
+            dir_name, fields=self._FOLDER_FIELDS_)
+        if folder_data is not None:
+            params = {
+                'q': "'{0}' in parents and name contains '{1}'".format(
+                    folder_data['id'], self._escape(file_root)),
+                'fields': 'nextPageToken, files(name)',
+                'pageSize': 1000,
+            }
+            while True:
+                results = self._execute(
+                    self._drive_service.files().list(**params).execute)
+                names.update(item['name'] for item in results.get('files', []))
+                params['pageToken'] = results.get('nextPageToken')
+                if not params['pageToken']:
+                    break
+        self._local.taken_names = (dir_name, names)
+        try:
+            while True:
+                name = super().get_available_name(name, max_length=max_length)
+                if folder_data is None or self._check_file_exists(
+                        name, fields=self._FOLDER_FIELDS_) is None:
+                    return name
+                # Created in the meanwhile
+                names.add(os.path.basename(name))
+        finally:
+            self._local.taken_names = None
+
+    def iter_dir(self, path, fields=None):
+        """
+        Iterate over the content of the specified path, fetching it one page
+        at a time, so that folders with many items are walked using constant
+        memory.
+
+        :param path: Folder whose content had to be listed
+        :type path: string
+        :param fields: Google Drive fields retrieved for every item (file fields by default)
+        :type fields: string
+        :returns: generator of dict containing file / folder data
+        """  # noqa: E501
+        if path == '/':
+            folder_data = {'id': 'root'}
+        else:
+            folder_data = self._check_file_exists(
+                path, fields=self._FOLDER_FIELDS_)
+        if not folder_data:
+            return
+        params = {
+            'q': "'{0}' in parents".format(folder_data['id']),
+            'fields': 'nextPageToken, files({0})'.format(
+                fields or self._file_fields),
+            'pageSize': 1000,
+        }
+        while True:
+            results = self._execute(
+                self._drive_service.files().list(**params).execute)
+            for item in results.get('files', []):
+                yield item
+            params['pageToken'] = results.get('nextPageToken')
+            if not params['pageToken']:
+                break
+
+    def _list_tree(self, folder_id):
+        """
+        Retrieve every item below a folder. Folders are explored one level
+        at a time, querying the children of many folders together.
+
+        :param folder_id: Unique identifier of the folder
+        :type folder_id: string
+        :returns: dict mapping the identifier of every folder to the list of its children
+        :rtype: dict of list of gdstorage.storage.GoogleDriveEntry
+        """  # noqa: E501
+        children = {}
+        level = [folder_id]
+        while level:
+            next_level = []
+            for i in range(0, len(level), self._TREE_QUERY_PARENTS_):
+                batch = level[i:i + self._TREE_QUERY_PARENTS_]
+                params = {
+                    'q': ' or '.join(
+                        "'{0}' in parents".format(p) for p in batch),
+                    'fields': 'nextPageToken, files(id, name, mimeType, parents, size)',  # noqa: E501
+                    'pageSize': 1000,
+                }
+                while True:
+                    results = self._execute(
+                        self._drive_service.files().list(**params).execute)
+                    for item in results.get('files', []):
+                        is_folder = item['mimeType'] == \
+                            self._GOOGLE_DRIVE_FOLDER_MIMETYPE_
+                        for parent_id in item.get('parents', []):
+                            if parent_id not in batch:
+                                continue
+                            children.setdefault(parent_id, []).append(
+                                GoogleDriveEntry(
+                                    item['id'], parent_id, item['name'],
+                                    is_folder,
+                                    None if is_folder
+                                    else int(item.get('size', 0)),
+                                )
+                            )
+                        if is_folder:
+                            next_level.append(item['id'])
+                    params['pageToken'] = results.get('nextPageToken')
+                    if not params['pageToken']:
+                        break
+            level = next_level
+        return children
+
+    def snapshot(self, path):
+        """
+        Retrieve every file and folder below the specified path with a few
+        bulk queries.
+
+        :param path: Folder to be retrieved
+        :type path: string
+        :returns: dict mapping the path of every item to its description
+        :rtype: dict of gdstorage.storage.GoogleDriveEntry
+        """
+        result = {}
+        for dirpath, directories, files in self._walk_entries(path):
+            for entry in directories + files:
+                result[os.path.join(dirpath, entry.name)] = entry
+        return result
+
+    def walk(self, path):
+        """
+        Walk the tree below the specified path in the same fashion of
+        :func:`os.walk` (top-down), retrieving it with a few bulk queries
+        instead of listing every folder.
+
+        :param path: Folder to be walked
+        :type path: string
+        :returns: generator of (dirpath, dirnames, filenames) tuples
+        """
+        for dirpath, directories, files in self._walk_entries(path):
+            yield (
+                dirpath,
+                [entry.name for entry in directories],
+                [entry.name for entry in files],
+            )
+
+    def _walk_entries(self, path):
+        """
+        Walk the tree below the specified path, yielding for every folder
+        a (dirpath, directories, files) tuple of
+        :class:`gdstorage.storage.GoogleDriveEntry` lists.
+        """
+        if path == '/':
+            folder_data = {'id': 'root'}
+        else:
+            folder_data = self._check_file_exists(
+                path, fields=self._FOLDER_FIELDS_)
+        if not folder_data:
+            return
+        children = self._list_tree(folder_data['id'])
+        pending = [(path, folder_data['id'])]
+        while pending:
+            dirpath, folder_id = pending.pop()
+            entries = children.get(folder_id, [])
+            directories = [entry for entry in entries if entry.is_folder]
+            files = [entry for entry in entries if not entry.is_folder]
+            yield dirpath, directories, files
+            for entry in reversed(directories):
+                pending.append(
+                    (os.path.join(dirpath, entry.name), entry.id))
 
     def listdir(self, path):
         """
@@ -366,47 +2686,131 @@ class GoogleDriveStorage(Storage):
         the first item being directories, the second item being files.
         """
         directories, files = [], []
-        if path == '/':
-            folder_id = {'id': 'root'}
-        else:
-            folder_id = self._check_file_exists(path)
-        if folder_id:
-            file_params = {
-                'q': "'{0}' in parents and mimeType != '{1}'".format(
-                    folder_id['id'], self._GOOGLE_DRIVE_FOLDER_MIMETYPE_),
-            }
-            dir_params = {
-                'q': "'{0}' in parents and mimeType = '{1}'".format(
-                    folder_id['id'], self._GOOGLE_DRIVE_FOLDER_MIMETYPE_),
-            }
-            files_results = self._drive_service.files().list(**file_params).execute()  # noqa: E501
-            dir_results = self._drive_service.files().list(**dir_params).execute()  # noqa: E501
-            files_list = files_results.get('files', [])
-            dir_list = dir_results.get('files', [])
-            for element in files_list:
-                files.append(os.path.join(path, element['name']))
-            for element in dir_list:
+        for element in self.iter_dir(path, fields='name, mimeType'):
+            if element['mimeType'] == self._GOOGLE_DRIVE_FOLDER_MIMETYPE_:
                 directories.append(os.path.join(path, element['name']))
+            else:
+                files.append(os.path.join(path, element['name']))
         return directories, files
 
+    def _make_stat(self, file_data):
+        """
+        Build a slim metadata record from the data returned by Google Drive
+
+        :param file_data: File data returned by Google Drive
+        :type file_data: dict
+        :rtype: gdstorage.storage.GoogleDriveStat
+        """
+        size = file_data.get('size')
+        created_time = file_data.get('createdTime')
+        modified_time = file_data.get('modifiedTime')
+        return GoogleDriveStat(
+            file_data['id'],
+            file_data['name'],
+            file_data.get('mimeType'),
+            None if size is None else int(size),
+            file_data.get('webContentLink'),
+            None if created_time is None else parse(created_time),
+            None if modified_time is None else parse(modified_time),
+        )
+
+    def stat(self, name):
+        """
+        Returns the metadata of the file specified by name.
+
+        :param name: File whose metadata had to be retrieved
+        :type name: string
+        :returns: Metadata of the file or None if it does not exists
+        :rtype: gdstorage.storage.GoogleDriveStat
+        """
+        file_data = self._check_file_exists(name)
+        if file_data is None:
+            return None
+        return self._make_stat(file_data)
+
+    def stat_many(self, names):
+        """
+        Returns the metadata of many files at once.
+        Names are grouped by folder: every folder is resolved once and its
+        children are retrieved with a few bulk queries.
+
+        :param names: Files whose metadata had to be retrieved
+        :type names: iterable of string
+        :returns: dict mapping every name to its metadata (None if the file does not exists)
+        :rtype: dict of gdstorage.storage.GoogleDriveStat
+        """  # noqa: E501
+        result = {}
+        groups = {}
+        for name in names:
+            if name in result:
+                continue
+            split_name = self._split_path(name)
+            file_data = self._path_cache.get(
+                self._cache_key(split_name), self._file_field_names)
+            if file_data is not None:
+                result[name] = self._make_stat(file_data)
+                continue
+            result[name] = None
+            groups.setdefault(tuple(split_name[:-1]), {}).setdefault(
+                split_name[-1], []).append(name)
+
+        for folder, group in groups.items():
+            parent_id = None
+            if folder:
+                folder_data = self._check_file_exists(
+                    '/'.join(folder), fields=self._FOLDER_FIELDS_)
+                if folder_data is None:
+                    continue
+                parent_id = folder_data['id']
+            file_names = list(group)
+            for i in range(0, len(file_names), self._STAT_QUERY_NAMES_):
+                q = ' or '.join(
+                    "name = '{0}'".format(self._escape(file_name))
+                    for file_name in file_names[i:i + self._STAT_QUERY_NAMES_]
+                )
+                if parent_id is not None:
+                    q = "'{0}' in parents and ({1})".format(parent_id, q)
+                params = {
+                    'q': q,
+                    'fields': 'nextPageToken, files({0})'.format(
+                        self._file_fields),
+                    'pageSize': 1000,
+                }
+                while True:
+                    results = self._execute(
+                        self._drive_service.files().list(**params).execute)
+                    for item in results.get('files', []):
+                        for name in group.get(item['name'], []):
+                            if result[name] is not None:
+                                continue
+                            result[name] = self._make_stat(item)
+                            self._path_cache.set(
+                                self._cache_key(self._split_path(name)),
+                                item, self._file_field_names,
+                            )
+                    params['pageToken'] = results.get('nextPageToken')
+                    if not params['pageToken']:
+                        break
+        return result
+
     def size(self, name):
         """
         Returns the total size, in bytes, of the file specified by name.
         """
-        file_data = self._check_file_exists(name)
+        file_data = self._check_file_exists(name, fields=self._SIZE_FIELDS_)
         if file_data is None:
             return 0
-        return file_data['size']
+        return self._make_stat(file_data).size
 
     def url(self, name):
         """
         Returns an absolute URL where the file's contents can be accessed
         directly by a Web browser.
         """
-        file_data = self._check_file_exists(name)
+        file_data = self._check_file_exists(name, fields=self._URL_FIELDS_)
         if file_data is None:
             return None
-        return file_data['webContentLink']
+        return self._make_stat(file_data).url
 
     def accessed_time(self, name):
         """
@@ -420,20 +2824,408 @@ class GoogleDriveStorage(Storage):
         Returns the creation time (as datetime object) of the file
         specified by name.
         """
-        file_data = self._check_file_exists(name)
+        file_data = self._check_file_exists(
+            name, fields=self._CREATED_TIME_FIELDS_)
         if file_data is None:
             return None
-        return parse(file_data['createdDate'])
+        return self._make_stat(file_data).created_time
 
     def modified_time(self, name):
         """
         Returns the last modified time (as datetime object) of the file
         specified by name.
         """
-        file_data = self._check_file_exists(name)
+        file_data = self._check_file_exists(
+            name, fields=self._MODIFIED_TIME_FIELDS_)
+        if file_data is None:
+            return None
+        return self._make_stat(file_data).modified_time
+
+    # Asynchronous API
+
+    def _async_client(self):
+        """
+        Asynchronous client of the running event loop, created on first use.
+        Every event loop has its own pool of connections, since they cannot
+        be shared between loops.
+
+        :rtype: gdstorage.storage._AsyncDriveClient
+        """
+        loop = asyncio.get_event_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = _AsyncDriveClient(
+                self._credentials, self._http_pool_size, self._http_timeout,
+                self._executor,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def _arun(self, steps):
+        """
+        Asynchronous counterpart of :meth:`_run`
+        """
+        client = self._async_client()
+        try:
+            method, kwargs = next(steps)
+            while True:
+                result = await client.files(method, **kwargs)
+                method, kwargs = steps.send(result)
+        except StopIteration as e:
+            return e.value
+
+    async def _aget_or_create_folder(self, split_path):
+        """
+        Asynchronous counterpart of :meth:`_get_or_create_folder`.
+        Creations of the same folder are coalesced with the ones issued by
+        the blocking API.
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :returns: dict
+        """
+        path = '/'.join(split_path)
+        folder_data = await self._arun(
+            self._resolve(path, fields=self._FOLDER_FIELDS_))
+        if folder_data is not None:
+            return folder_data
+
+        key = self._cache_key(split_path)
+        with self._folder_creations_lock:
+            creation = self._folder_creations.get(key)
+            leader = creation is None
+            if leader:
+                creation = Future()
+                self._folder_creations[key] = creation
+        if not leader:
+            return await asyncio.wrap_future(creation)
+        try:
+            if self._path_cache.enabled:
+                folder_data = self._path_cache.get(
+                    key, self._FOLDER_FIELDS_, record=False)
+            else:
+                folder_data = await self._arun(
+                    self._resolve(path, fields=self._FOLDER_FIELDS_))
+            if folder_data is None:
+                folder_data = await self._acreate_folder(split_path)
+        except BaseException as e:
+            creation.set_exception(e)
+            raise
+        else:
+            creation.set_result(folder_data)
+        finally:
+            with self._folder_creations_lock:
+                del self._folder_creations[key]
+        return folder_data
+
+    async def _acreate_folder(self, split_path):
+        """
+        Asynchronous counterpart of :meth:`_create_folder`
+
+        :param split_path: Path splitted by :meth:`_split_path`
+        :type split_path: list
+        :returns: dict
+        """
+        meta_data = {
+            'name': split_path[-1],
+            'mimeType': self._GOOGLE_DRIVE_FOLDER_MIMETYPE_
+        }
+        if split_path[:-1]:
+            parent_data = await self._aget_or_create_folder(split_path[:-1])
+            meta_data['parents'] = [parent_data['id']]
+        if self._index_paths:
+            meta_data['appProperties'] = {
+                self._PATH_INDEX_KEY_: self._path_index_value(split_path)
+            }
+        folder_data = await self._async_client().files(
+            'create', body=meta_data, fields=', '.join(self._FOLDER_FIELDS_))
+        if self._inherit_permissions:
+            parent_folder_id = meta_data.get('parents', [None])[0]
+            if parent_folder_id not in self._permitted_folders:
+                await self._acreate_permissions(
+                    folder_data['id'], self._permissions)
+            with self._permitted_folders_lock:
+                self._permitted_folders.add(folder_data['id'])
+        self._path_cache.set(
+            self._cache_key(split_path), folder_data, self._FOLDER_FIELDS_)
+        return folder_data
+
+    async def _acreate_permissions(self, file_id, permissions):
+        """
+        Asynchronous counterpart of :meth:`_create_permissions`, issuing the
+        requests concurrently.
+        """
+        client = self._async_client()
+        responses = await asyncio.gather(
+            *[client.create_permission(file_id, {**p.raw})
+              for p in permissions],
+            return_exceptions=True
+        )
+        errors = [
+            (p, response) for p, response in zip(permissions, responses)
+            if isinstance(response, Exception)
+        ]
+        if errors:
+            raise GoogleDrivePermissionError(file_id, errors)
+
+    async def _aensure_folder_permissions(self, folder_id):
+        """
+        Asynchronous counterpart of :meth:`_ensure_folder_permissions`
+        """
+        if folder_id in self._permitted_folders:
+            return
+        results = await self._async_client().list_permissions(
+            folder_id, 'permissions(type, role, emailAddress)')
+        await self._acreate_permissions(
+            folder_id, self._missing_permissions(results))
+        with self._permitted_folders_lock:
+            self._permitted_folders.add(folder_id)
+
+    async def _aget_available_name(self, name, max_length=None):
+        """
+        Asynchronous counterpart of :meth:`get_available_name`.
+        Alternative names are generated by Django as usual, checking them
+        against the names already known to be taken.
+        """
+        name = str(name).replace('\\', '/')
+        dir_name, file_name = os.path.split(name)
+        names = set()
+        if self._overwrite:
+            # Existing files are overwritten, so every name is available
+            self._local.taken_names = (dir_name, names)
+            try:
+                return Storage.get_available_name(
+                    self, name, max_length=max_length)
+            finally:
+                self._local.taken_names = None
+        if dir_name:
+            folder_data = await self._arun(
+                self._resolve(dir_name, fields=self._FOLDER_FIELDS_))
+            if folder_data is None:
+                # The folder does not exist yet, so every name is available
+                self._local.taken_names = (dir_name, names)
+                try:
+                    return Storage.get_available_name(
+                        self, name, max_length=max_length)
+                finally:
+                    self._local.taken_names = None
+            params = {
+                'q': "'{0}' in parents and name contains '{1}'".format(
+                    folder_data['id'],
+                    self._escape(file_name.split('.', 1)[0])),
+                'fields': 'nextPageToken, files(name)',
+                'pageSize': 1000,
+            }
+            client = self._async_client()
+            while True:
+                results = await client.files('list', **params)
+                names.update(item['name'] for item in results.get('files', []))
+                params['pageToken'] = results.get('nextPageToken')
+                if not params['pageToken']:
+                    break
+        while True:
+            # No await between setting and clearing the names, so other
+            # tasks of the loop cannot see them
+            self._local.taken_names = (dir_name, names)
+            try:
+                name = Storage.get_available_name(
+                    self, name, max_length=max_length)
+            finally:
+                self._local.taken_names = None
+            if not await self.aexists(name):
+                return name
+            names.add(os.path.basename(name))
+
+    async def asave(self, name, content, max_length=None):
+        """
+        Asynchronous counterpart of :meth:`save`.
+        Saves new content to the file specified by name, returning the
+        actual name of the stored file.
+
+        :param name: Name of the file
+        :type name: string
+        :param content: Content of the file
+        :type content: django.core.files.File or file object
+        :param int max_length: Maximum length of the returned name
+        :returns: string
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = await self._aget_available_name(name, max_length=max_length)
+
+        name = os.path.join(settings.GOOGLE_DRIVE_STORAGE_MEDIA_ROOT, name)
+        split_name = self._split_path(name)
+        if split_name[:-1]:
+            folder_data = await self._aget_or_create_folder(split_name[:-1])
+        else:
+            folder_data = await self._arun(
+                self._resolve('', fields=self._FOLDER_FIELDS_))
+        mime_type, _ = mimetypes.guess_type(name)
+        if mime_type is None:
+            mime_type = self._UNKNOWN_MIMETYPE_
+        resumable = content.size is None or \
+            content.size >= self._multipart_threshold
+        md5 = None
+        if self._deduplicate or \
+                (resumable and self._upload_session_store is not None):
+            # Hashing big contents would block the event loop
+            md5 = await asyncio.get_event_loop().run_in_executor(
+                None, self._content_md5, content.file)
+        existing_data = None
+        if self._overwrite:
+            existing_data = self._overwrite_target(
+                name, await self._arun(
+                    self._resolve(name, fields=self._CHECKSUM_FIELDS_)))
+        if existing_data is not None:
+            if md5 is not None and existing_data.get('md5Checksum') == md5:
+                return existing_data['name']
+        elif self._deduplicate:
+            file_data = await self._arun(self._find_duplicate(
+                folder_data['id'], md5, content.size))
+            if file_data is not None:
+                await self._arun(self._change_references(file_data['id'], 1))
+                self._path_cache.set(
+                    self._cache_key(split_name[:-1] + [file_data['name']]),
+                    file_data, self._file_field_names)
+                return file_data['name']
+        body = self._upload_metadata(
+            split_name, mime_type, folder_data['id'], md5)
+        session_key = None
+        if resumable and self._upload_session_store is not None:
+            session_key = self._upload_session_key(split_name, md5)
+        client = self._async_client()
+        file_data = None
+        if existing_data is not None:
+            from googleapiclient.errors import HttpError
+
+            try:
+                file_data = await client.upload(
+                    {
+                        k: v for k, v in body.items()
+                        if k not in ('name', 'parents')
+                    },
+                    content.file, content.size, mime_type, self._file_fields,
+                    resumable, self._upload_chunk_size,
+                    self._upload_max_chunk_size, self._upload_session_store,
+                    session_key, existing_data['id'],
+                )
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                self._path_cache.invalidate(
+                    '/'.join(split_name), existing_data['id'])
+                existing_data = None
+        if file_data is None:
+            file_data = await client.upload(
+                body, content.file, content.size, mime_type,
+                self._file_fields, resumable,
+                self._upload_chunk_size, self._upload_max_chunk_size,
+                self._upload_session_store, session_key,
+            )
+        self._path_cache.set(
+            self._cache_key(split_name), file_data, self._file_field_names)
+
+        if existing_data is None:
+            if self._inherit_permissions and split_name[:-1]:
+                await self._aensure_folder_permissions(folder_data['id'])
+            else:
+                await self._acreate_permissions(
+                    file_data['id'], self._permissions)
+
+        return file_data.get('originalFilename', file_data.get('name'))
+
+    async def aopen(self, name, mode='rb'):
+        """
+        Asynchronous counterpart of :meth:`open`.
+        The content is downloaded on demand while it is read.
+
+        :param name: Name of the file
+        :type name: string
+        :rtype: gdstorage.storage._AsyncGoogleDriveFile
+        """
+        file_data = await self._arun(
+            self._resolve(name, fields=self._SIZE_FIELDS_))
+        if file_data is None:
+            raise FileNotFoundError(
+                'File {0} does not exist on Google Drive'.format(name))
+        return _AsyncGoogleDriveFile(
+            self._async_client(), file_data['id'], name,
+            int(file_data.get('size', 0)), self._download_chunk_size,
+        )
+
+    async def adelete(self, name):
+        """
+        Asynchronous counterpart of :meth:`delete`
+        """
+        file_data = await self._arun(
+            self._resolve(name, fields=self._FOLDER_FIELDS_))
+        if file_data is not None:
+            if self._deduplicate and await self._arun(
+                    self._change_references(file_data['id'], -1)) > 0:
+                return
+            await self._async_client().files(
+                'delete', fileId=file_data['id'])
+            self._path_cache.invalidate(
+                '/'.join(self._split_path(name)), file_data['id'])
+
+    async def aexists(self, name):
+        """
+        Asynchronous counterpart of :meth:`exists`
+        """
+        return (await self._arun(
+            self._resolve(name, fields=self._FOLDER_FIELDS_))) is not None
+
+    async def alistdir(self, path):
+        """
+        Asynchronous counterpart of :meth:`listdir`
+        """
+        if path == '/':
+            folder_data = {'id': 'root'}
+        else:
+            folder_data = await self._arun(
+                self._resolve(path, fields=self._FOLDER_FIELDS_))
+        directories, files = [], []
+        if not folder_data:
+            return directories, files
+        params = {
+            'q': "'{0}' in parents".format(folder_data['id']),
+            'fields': 'nextPageToken, files(name, mimeType)',
+            'pageSize': 1000,
+        }
+        client = self._async_client()
+        while True:
+            results = await client.files('list', **params)
+            for element in results.get('files', []):
+                if element['mimeType'] == self._GOOGLE_DRIVE_FOLDER_MIMETYPE_:
+                    directories.append(os.path.join(path, element['name']))
+                else:
+                    files.append(os.path.join(path, element['name']))
+            params['pageToken'] = results.get('nextPageToken')
+            if not params['pageToken']:
+                break
+        return directories, files
+
+    async def asize(self, name):
+        """
+        Asynchronous counterpart of :meth:`size`
+        """
+        file_data = await self._arun(
+            self._resolve(name, fields=self._SIZE_FIELDS_))
+        if file_data is None:
+            return 0
+        return self._make_stat(file_data).size
+
+    async def aurl(self, name):
+        """
+        Asynchronous counterpart of :meth:`url`
+        """
+        file_data = await self._arun(
+            self._resolve(name, fields=self._URL_FIELDS_))
         if file_data is None:
             return None
-        return parse(file_data['modifiedDate'])
+        return self._make_stat(file_data).url
 
     def deconstruct(self):
         """
@@ -445,3 +3237,109 @@ class GoogleDriveStorage(Storage):
         if self._json_keyfile_path is not None:
             kwargs['json_keyfile_path'] = self._json_keyfile_path
         return name, path, args, kwargs
+
+
+class _PrefetchedStorage(object):
+    """
+    Stand-in for the storage of the files handled by
+    :func:`prefetch_drive_metadata`. It answers metadata lookups from the
+    records retrieved in advance and delegates everything else to the
+    actual storage. It is attached to the ``FieldFile`` instances, so the
+    records live as long as them, whatever the size of the path cache.
+
+    :param storage: Actual storage of the files
+    :type storage: gdstorage.storage.GoogleDriveStorage
+    :param stats: Metadata by name, as returned by :meth:`.GoogleDriveStorage.stat_many`
+    :type stats: dict
+    """  # noqa: E501
+
+    def __init__(self, storage, stats):
+        self._storage = storage
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+    def stat(self, name):
+        if name not in self._stats:
+            return self._storage.stat(name)
+        return self._stats[name]
+
+    def exists(self, name):
+        if name not in self._stats:
+            return self._storage.exists(name)
+        return self._stats[name] is not None
+
+    def size(self, name):
+        if name not in self._stats:
+            return self._storage.size(name)
+        file_stat = self._stats[name]
+        return 0 if file_stat is None else file_stat.size
+
+    def url(self, name):
+        if name not in self._stats:
+            return self._storage.url(name)
+        file_stat = self._stats[name]
+        return None if file_stat is None else file_stat.url
+
+    def accessed_time(self, name):
+        return self.modified_time(name)
+
+    def created_time(self, name):
+        if name not in self._stats:
+            return self._storage.created_time(name)
+        file_stat = self._stats[name]
+        return None if file_stat is None else file_stat.created_time
+
+    def modified_time(self, name):
+        if name not in self._stats:
+            return self._storage.modified_time(name)
+        file_stat = self._stats[name]
+        return None if file_stat is None else file_stat.modified_time
+
+    def save(self, name, content, max_length=None):
+        name = self._storage.save(name, content, max_length=max_length)
+        self._stats.pop(name, None)
+        return name
+
+    def delete(self, name):
+        self._stats.pop(name, None)
+        self._storage.delete(name)
+
+
+def prefetch_drive_metadata(queryset, *field_names):
+    """
+    Retrieve, with grouped Google Drive queries, the metadata of the files
+    referenced by some ``FileField`` of every instance of a queryset, and
+    attach it to their ``FieldFile``, so that following ``url`` and ``size``
+    calls on those fields are served without hitting the network (see
+    :class:`_PrefetchedStorage`).
+
+    The queryset is evaluated (and its result cache filled), so it can be
+    iterated afterwards without further database queries.
+
+    :param queryset: Queryset (or iterable of model instances) to prefetch
+    :param field_names: Names of the file fields whose metadata had to be retrieved
+    :type field_names: string
+    :returns: The given queryset
+    """  # noqa: E501
+    storages = {}
+    for instance in queryset:
+        for field_name in field_names:
+            field_file = getattr(instance, field_name)
+            if not field_file:
+                continue
+            storage = field_file.storage
+            if isinstance(storage, _PrefetchedStorage):
+                # Prefetched again
+                storage = storage._storage
+            if not isinstance(storage, GoogleDriveStorage):
+                continue
+            _, field_files = storages.setdefault(id(storage), (storage, []))
+            field_files.append(field_file)
+    for storage, field_files in storages.values():
+        prefetched_storage = _PrefetchedStorage(storage, storage.stat_many(
+            set(field_file.name for field_file in field_files)))
+        for field_file in field_files:
+            field_file.storage = prefetched_storage
+    return queryset
@@ -1,12 +1,21 @@
+import asyncio
+import io
+import json
 import os
 import os.path
 import time
 
+import httplib2
 import pytest
+from django.core.files.base import ContentFile
+from googleapiclient.errors import HttpError
 
+from gdstorage import storage
 from gdstorage.storage import (GoogleDriveFilePermission,
                                GoogleDrivePermissionRole,
-                               GoogleDrivePermissionType, GoogleDriveStorage)
+                               GoogleDrivePermissionType, GoogleDriveStorage,
+                               _adapt_chunk_size, _GoogleDriveStream,
+                               _RequestExecutor)
 
 SLEEP_INTERVAL = 10
 
@@ -16,6 +25,11 @@ def gds():
     return GoogleDriveStorage()
 
 
+@pytest.fixture
+def overwrite_gds():
+    return GoogleDriveStorage(overwrite=True)
+
+
 @pytest.fixture
 def write_perm_gds():
     return GoogleDriveStorage(
@@ -120,3 +134,287 @@ class TestGoogleDriveStorage:
         file = gds.open('/test5/huge_file', 'rb')
         assert file, 'Unable to load data from Google Drive'
         time.sleep(SLEEP_INTERVAL)
+
+    def test_path_cache(self, gds):
+        folder_data = gds._get_or_create_folder('test4/folder')
+        assert folder_data, "Unable to find or create folder 'test4/folder'"
+        hits = gds.cache_info().hits
+        assert gds.exists('test4/folder'), 'Unable to find cached folder'
+        assert gds.cache_info().hits == hits + 1, 'Path cache was not used'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_iter_dir(self, gds):
+        self._test_upload_file(gds)
+        names = [item['name'] for item in gds.iter_dir('/test4')]
+        assert 'gdrive_logo.png' in names, 'Unable to iterate directory data'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_walk(self, gds):
+        self._test_upload_file(gds)
+        tree = list(gds.walk('/test4'))
+        assert tree, 'Unable to walk directory tree'
+        assert 'gdrive_logo.png' in tree[0][2], 'Unable to walk directory tree'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_stat_many(self, gds):
+        self._test_upload_file(gds)
+        result = gds.stat_many(['/test4/gdrive_logo.png', '/test4/missing'])
+        assert result['/test4/gdrive_logo.png'].size > 0, \
+            'Unable to read file metadata'
+        assert result['/test4/missing'] is None, 'Missing file has metadata'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_get_available_name(self, gds):
+        self._test_upload_file(gds)
+        name = gds.get_available_name('test4/gdrive_logo.png')
+        assert name != 'test4/gdrive_logo.png', 'Name is already taken'
+        assert not gds.exists(name), 'Name is already taken'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_save_many(self, gds):
+        file_name = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            '../test/gdrive_logo.png',
+        )
+        with open(file_name, 'rb') as first, open(file_name, 'rb') as second:
+            results = gds.save_many([
+                ('/test6/gdrive_logo.png', first),
+                ('/test6/gdrive_logo.png', second),
+            ])
+        assert all(r.error is None for r in results), \
+            'Unable to upload files to Google Drive'
+        assert results[0].saved_name != results[1].saved_name, \
+            'Files were saved with the same name'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_async_exists(self, gds):
+        # The asynchronous API needs the optional httpx dependency
+        pytest.importorskip('httpx')
+        self._test_upload_file(gds)
+        loop = asyncio.get_event_loop()
+        assert loop.run_until_complete(
+            gds.aexists('/test4/gdrive_logo.png')), \
+            'Unable to find file with the asynchronous API'
+        time.sleep(SLEEP_INTERVAL)
+
+    def test_overwrite(self, overwrite_gds):
+        first = overwrite_gds.save(
+            '/test7/overwrite.txt', ContentFile(b'first'))
+        file_id = overwrite_gds.stat('/test7/overwrite.txt').id
+        second = overwrite_gds.save(
+            '/test7/overwrite.txt', ContentFile(b'second'))
+        assert first == second, 'File was saved with another name'
+        assert overwrite_gds.stat('/test7/overwrite.txt').id == file_id, \
+            'File was not overwritten'
+        time.sleep(SLEEP_INTERVAL)
+
+
+def _http_error(status, content=b'', headers=None):
+    info = {'status': str(status)}
+    info.update(headers or {})
+    return HttpError(httplib2.Response(info), content)
+
+
+def _rate_limit_error(reason):
+    return _http_error(403, json.dumps(
+        {'error': {'errors': [{'reason': reason}]}}).encode())
+
+
+class _FakeTime:
+    """
+    Clock replacing the time module of the storage, advanced by sleep
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRequestExecutor:
+    def test_is_retryable(self):
+        executor = _RequestExecutor(None, 3)
+        assert executor.is_retryable(_http_error(429))
+        assert executor.is_retryable(_http_error(500))
+        assert executor.is_retryable(_http_error(503))
+        assert executor.is_retryable(
+            _rate_limit_error('userRateLimitExceeded'))
+        assert executor.is_retryable(_rate_limit_error('rateLimitExceeded'))
+        assert not executor.is_retryable(_http_error(404))
+        assert not executor.is_retryable(
+            _rate_limit_error('insufficientFilePermissions'))
+        assert not executor.is_retryable(_http_error(403, b'not json'))
+        assert not executor.is_retryable(ValueError())
+
+    def test_retry_delay(self):
+        executor = _RequestExecutor(None, 3)
+        error = _http_error(503)
+        for attempt in range(3):
+            delay = executor._RETRY_BASE_DELAY_ * 2 ** attempt
+            assert delay / 2 <= executor.retry_delay(error, attempt) <= delay
+        assert executor.retry_delay(error, 3) is None, \
+            'Retried more than max_retries times'
+        assert executor.retry_delay(_http_error(404), 0) is None
+        assert executor.stats().retried == 3
+
+    def test_retry_delay_is_capped(self):
+        executor = _RequestExecutor(None, 20)
+        assert executor.retry_delay(_http_error(503), 19) <= \
+            executor._RETRY_MAX_DELAY_
+
+    def test_retry_after(self):
+        executor = _RequestExecutor(None, 3)
+        error = _http_error(429, headers={'retry-after': '30'})
+        assert executor.retry_delay(error, 0) == 30
+
+    def test_execute_retries(self, monkeypatch):
+        clock = _FakeTime()
+        monkeypatch.setattr(storage, 'time', clock)
+        executor = _RequestExecutor(None, 3)
+        errors = [_http_error(503), _rate_limit_error('rateLimitExceeded')]
+
+        def call():
+            if errors:
+                raise errors.pop(0)
+            return 'done'
+
+        assert executor.execute(call) == 'done'
+        assert len(clock.sleeps) == 2
+        assert executor.stats() == (3, 0, 2)
+
+    def test_execute_raises_not_retryable(self, monkeypatch):
+        monkeypatch.setattr(storage, 'time', _FakeTime())
+        executor = _RequestExecutor(None, 3)
+        calls = []
+
+        def call():
+            calls.append(1)
+            raise _http_error(404)
+
+        with pytest.raises(HttpError):
+            executor.execute(call)
+        assert len(calls) == 1
+
+    def test_token_bucket(self, monkeypatch):
+        clock = _FakeTime()
+        monkeypatch.setattr(storage, 'time', clock)
+        executor = _RequestExecutor(2, 0)
+        assert executor._reserve(1) == 0
+        assert executor._reserve(1) == 0
+        assert executor._reserve(1) == pytest.approx(0.5), \
+            'Requests above max_qps were not delayed'
+        clock.now += 1
+        assert executor._reserve(1) == 0
+        assert executor.stats().throttled == 1
+
+    def test_execute_waits_for_tokens(self, monkeypatch):
+        clock = _FakeTime()
+        monkeypatch.setattr(storage, 'time', clock)
+        executor = _RequestExecutor(1, 0)
+        for _ in range(3):
+            executor.execute(lambda: None)
+        assert clock.now == pytest.approx(2)
+
+
+class _FakeMediaService:
+    """
+    Google Drive service serving the content of a single file with Range
+    requests
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return _FakeMediaRequest(self)
+
+
+class _FakeMediaRequest:
+    def __init__(self, service):
+        self.service = service
+        self.headers = {}
+
+    def execute(self):
+        start, end = map(int, self.headers['range'][6:].split('-'))
+        self.service.ranges.append((start, end))
+        if start >= len(self.service.data):
+            raise _http_error(416)
+        return self.service.data[start:end + 1]
+
+
+class TestGoogleDriveStream:
+    data = bytes(range(256)) * 16
+
+    def _stream(self, size=len(data)):
+        service = _FakeMediaService(self.data)
+        return service, _GoogleDriveStream(
+            service, 'id', size, chunk_size=1024, block_size=128,
+            cache_size=1024)
+
+    def test_sequential_read(self):
+        service, stream = self._stream()
+        assert io.BufferedReader(stream, 64).read() == self.data
+        lengths = [end - start + 1 for start, end in service.ranges]
+        assert lengths[:4] == [128, 256, 512, 1024], \
+            'Sequential reads did not grow the read-ahead'
+        assert max(lengths) == 1024
+
+    def test_random_read(self):
+        service, stream = self._stream()
+        stream.seek(1000)
+        assert stream.read(10) == self.data[1000:1010]
+        assert service.ranges == [(896, 1023)], \
+            'More than the block was fetched by a random read'
+        stream.seek(990)
+        assert stream.read(10) == self.data[990:1000]
+        assert len(service.ranges) == 1, 'Cached block was fetched again'
+
+    def test_seek(self):
+        _, stream = self._stream()
+        assert stream.seekable()
+        assert stream.seek(-10, io.SEEK_END) == len(self.data) - 10
+        assert stream.read() == self.data[-10:]
+        assert stream.read() == b''
+        assert stream.seek(-5, io.SEEK_CUR) == len(self.data) - 5
+        with pytest.raises(ValueError):
+            stream.seek(-1)
+
+    def test_unknown_size(self):
+        service, stream = self._stream(size=None)
+        assert not stream.seekable()
+        with pytest.raises(io.UnsupportedOperation):
+            stream.seek(0, io.SEEK_END)
+        assert io.BufferedReader(stream, 64).read() == self.data, \
+            'Range not satisfiable was not handled as end of file'
+        assert service.ranges[-1][0] >= len(self.data)
+
+
+class TestAdaptChunkSize:
+    unit = 256 * 1024
+
+    def test_grows_with_throughput(self):
+        assert _adapt_chunk_size(self.unit, 0.1, 64 * self.unit) == \
+            2 * self.unit, 'Chunk size grew more than twice'
+
+    def test_never_shrinks(self):
+        assert _adapt_chunk_size(4 * self.unit, 60, 64 * self.unit) == \
+            4 * self.unit
+
+    def test_bounded(self):
+        assert _adapt_chunk_size(
+            4 * self.unit, 0.1, 5 * self.unit + 1) == 5 * self.unit
+
+    def test_multiple_of_unit(self):
+        for elapsed in (1, 2.5, 3.2, 4, 7):
+            size = _adapt_chunk_size(2 * self.unit, elapsed, 64 * self.unit)
+            assert size % self.unit == 0
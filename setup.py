@@ -8,8 +8,9 @@ long_description = codecs.open('README.rst', "r").read()
 # See https://hynek.me/articles/conditional-python-dependencies/
 
 INSTALL_REQUIRES = [
-    "google-api-python-client >= 1.8.2",
+    "google-api-python-client >= 2.0.0",
     "google-auth >= 1.28.0,<2",
+    "requests >= 2.20.0",
     "python-dateutil >= 2.5.3",
     "Django >= 2.2"
 ]
@@ -32,6 +33,9 @@ setuptools.setup(
         '': ['README.rst'],
     },
     install_requires=INSTALL_REQUIRES,
+    extras_require={
+        "async": ["httpx >= 0.18.0"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Framework :: Django",